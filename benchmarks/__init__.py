@@ -0,0 +1,16 @@
+"""
+    benchmarks
+    ~~~~~~~~~~
+    Measures the overhead of flump's request pipeline, using in-memory
+    Fetcher and OrmIntegration stand-ins so that only flump, Flask and
+    marshmallow are timed.
+
+    Run the scenarios and save the results with::
+
+        python -m benchmarks.run --output results.json
+
+    and compare the results of two runs, for instance from different
+    commits, with::
+
+        python -m benchmarks.compare base.json results.json
+"""
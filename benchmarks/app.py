@@ -0,0 +1,100 @@
+from collections import namedtuple
+
+from flask import Flask
+from marshmallow import fields, Schema
+
+from flump import Fetcher, FlumpBlueprint, FlumpView, OrmIntegration
+from flump.instrumentation import Instrumentation
+from flump.pagination import PageSizePagination
+
+
+def make_schema(num_fields):
+    """
+    :returns: A Schema with `num_fields` string fields, named `field_0`
+              onwards.
+    """
+    attrs = {'field_{}'.format(i): fields.Str() for i in range(num_fields)}
+    return type('BenchmarkSchema', (Schema, ), attrs)
+
+
+def make_entities(num_entities, num_fields):
+    """
+    :returns: A list of `num_entities` entities with ids starting at 1, and
+              a value for each of the fields of :func:`make_schema`.
+    """
+    field_names = ['field_{}'.format(i) for i in range(num_fields)]
+    entity_class = namedtuple('Entity', ['id', 'etag'] + field_names)
+    return [
+        entity_class(str(i), 'etag-{}'.format(i),
+                     *('value {} {}'.format(i, name) for name in field_names))
+        for i in range(1, num_entities + 1)
+    ]
+
+
+def make_app(num_fields, num_entities, paginated=False, page_size=10):
+    """
+    Builds an app with a single `entity` view backed by an in-memory list of
+    entities. Writes are not stored, so every request sees the same data.
+
+    The durations of the phases of each request, recorded by
+    :class:`flump.instrumentation.Instrumentation`, are appended to the
+    `app.phase_timings` list.
+
+    :param num_fields:   The number of fields on the view's SCHEMA.
+    :param num_entities: The number of entities in the collection.
+    :param paginated:    Whether the view uses :class:`PageSizePagination`.
+    :param page_size:    The default page size, if `paginated`.
+    """
+    entities = make_entities(num_entities, num_fields)
+
+    class BenchmarkFetcher(Fetcher):
+        def get_entity(self, entity_id):
+            index = int(entity_id) - 1
+            if 0 <= index < len(entities):
+                return entities[index]
+
+        def get_total_entities(self, **kwargs):
+            return len(entities)
+
+        def get_many_entities(self, pagination_args, **kwargs):
+            if pagination_args is None:
+                return entities
+            start = (pagination_args.page - 1) * pagination_args.size
+            return entities[start:start + pagination_args.size]
+
+    class BenchmarkOrmIntegration(OrmIntegration):
+        def create_entity(self, data):
+            return entities[0]._replace(id=str(len(entities) + 1), **data)
+
+        def update_entity(self, existing_entity, data):
+            return existing_entity._replace(**data)
+
+    class Paginator(PageSizePagination):
+        DEFAULT_PAGE_SIZE = page_size
+        MAX_PAGE_SIZE = max(page_size, PageSizePagination.MAX_PAGE_SIZE)
+
+    class BenchmarkView(FlumpView):
+        RESOURCE_NAME = 'entity'
+        SCHEMA = make_schema(num_fields)
+        FETCHER = BenchmarkFetcher
+        ORM_INTEGRATION = BenchmarkOrmIntegration
+        if paginated:
+            PAGINATOR = Paginator
+
+    phase_timings = []
+
+    class PhaseRecorder(Instrumentation):
+        def request_finished(self, timings, response):
+            phase_timings.append(dict(timings.durations))
+
+    blueprint = FlumpBlueprint(
+        'benchmark', __name__,
+        instrumentation=PhaseRecorder(server_timing=False)
+    )
+    blueprint.register_flump_view(BenchmarkView, '/entity/')
+
+    app = Flask(__name__)
+    app.config['SERVER_NAME'] = 'localhost'
+    app.register_blueprint(blueprint)
+    app.phase_timings = phase_timings
+    return app
@@ -0,0 +1,64 @@
+"""
+Compares two sets of results from :mod:`benchmarks.run`, reporting the change
+in the median latency of each scenario. Exits with status 1 if any scenario
+regressed by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+
+def compare(base, head, threshold=0.1):
+    """
+    :param base:      The results to compare against.
+    :param head:      The new results.
+    :param threshold: The relative increase in median latency above which a
+                      scenario is considered to have regressed.
+    :returns: A list of `(name, base_p50, head_p50, change, regressed)`
+              tuples for each scenario in both sets of results, where
+              `change` is the relative change in median latency.
+    """
+    base_results = {result['name']: result for result in base['results']}
+    comparisons = []
+    for result in head['results']:
+        if result['name'] not in base_results:
+            continue
+        base_p50 = base_results[result['name']]['latency']['p50']
+        head_p50 = result['latency']['p50']
+        change = (head_p50 - base_p50) / base_p50
+        comparisons.append((result['name'], base_p50, head_p50, change,
+                            change > threshold))
+    return comparisons
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('base', help='Results file to compare against.')
+    parser.add_argument('head', help='Results file with the new results.')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Relative slowdown considered a regression.')
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    comparisons = compare(base, head, args.threshold)
+    width = max([len(c[0]) for c in comparisons] + [8])
+    sys.stdout.write('{:<{}}  {:>10}  {:>10}  {:>8}\n'.format(
+        'scenario', width, 'base p50', 'head p50', 'change'
+    ))
+    row = '{:<{}}  {:>8.3f}ms  {:>8.3f}ms  {:>+7.1%}{}\n'
+    for name, base_p50, head_p50, change, regressed in comparisons:
+        sys.stdout.write(row.format(
+            name, width, base_p50 * 1000, head_p50 * 1000, change,
+            '  REGRESSED' if regressed else ''
+        ))
+
+    if any(c[4] for c in comparisons):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""
+Runs the benchmark scenarios, and reports the throughput and latency of each
+as JSON. Latencies and phase timings are in seconds.
+"""
+import argparse
+from collections import namedtuple
+import json
+import platform
+import sys
+from timeit import default_timer
+
+import flump
+
+from .app import make_app
+
+#: A single benchmark. `app_kwargs` are passed to :func:`.app.make_app`, and
+#: `make_request` is called with a test client and the number of fields to
+#: make a single request.
+Scenario = namedtuple('Scenario', ('name', 'app_kwargs', 'make_request'))
+
+
+def _get_single(query_string=None):
+    def make_request(client, num_fields):
+        return client.get('/entity/1', query_string=query_string)
+    return make_request
+
+
+def _get_many(query_string=None):
+    def make_request(client, num_fields):
+        return client.get('/entity', query_string=query_string)
+    return make_request
+
+
+def _document(num_fields, entity_id=None):
+    data = {
+        'type': 'entity',
+        'attributes': {'field_{}'.format(i): 'new value'
+                       for i in range(num_fields)}
+    }
+    if entity_id is not None:
+        data['id'] = entity_id
+    return json.dumps({'data': data})
+
+
+def _post(client, num_fields):
+    return client.post('/entity', data=_document(num_fields),
+                       content_type='application/vnd.api+json')
+
+
+def _patch(client, num_fields):
+    return client.patch('/entity/1', data=_document(num_fields, '1'),
+                        content_type='application/vnd.api+json',
+                        headers=[('If-Match', 'etag-1')])
+
+
+#: Selects 2 of the fields.
+SPARSE_FIELDSET = {'fields[entity]': 'field_0,field_1'}
+
+
+def build_scenarios():
+    """
+    :returns: A list of :class:`Scenario`, covering each method with small
+              and large schemas, get_many at several page sizes with and
+              without pagination, and sparse fieldsets.
+    """
+    scenarios = []
+    for num_fields in (5, 50):
+        app_kwargs = {'num_fields': num_fields, 'num_entities': 1}
+        scenarios.extend([
+            Scenario('get_single/fields={}'.format(num_fields), app_kwargs,
+                     _get_single()),
+            Scenario('post/fields={}'.format(num_fields), app_kwargs, _post),
+            Scenario('patch/fields={}'.format(num_fields), app_kwargs,
+                     _patch),
+        ])
+    scenarios.append(Scenario(
+        'get_single/fields=50/sparse', {'num_fields': 50, 'num_entities': 1},
+        _get_single(SPARSE_FIELDSET)
+    ))
+
+    for page_size in (10, 100):
+        for num_fields in (5, 50):
+            for paginated in (False, True):
+                name = 'get_many/page_size={}/fields={}/paginated={}'.format(
+                    page_size, num_fields, paginated
+                )
+                # Paginated collections hold several pages, so that the
+                # pagination links are built as for a real collection.
+                app_kwargs = {
+                    'num_fields': num_fields, 'paginated': paginated,
+                    'page_size': page_size,
+                    'num_entities': page_size * (5 if paginated else 1)
+                }
+                scenarios.append(Scenario(name, app_kwargs, _get_many()))
+        scenarios.append(Scenario(
+            'get_many/page_size={}/fields=50/sparse'.format(page_size),
+            {'num_fields': 50, 'num_entities': page_size},
+            _get_many(SPARSE_FIELDSET)
+        ))
+    return scenarios
+
+
+def run_scenario(scenario, iterations, warmup=10):
+    """
+    Makes `warmup` untimed requests followed by `iterations` timed requests
+    for the `scenario`.
+
+    :returns: A dict of the results.
+    :raises RuntimeError: If any request is unsuccessful.
+    """
+    app = make_app(**scenario.app_kwargs)
+    client = app.test_client()
+    num_fields = scenario.app_kwargs['num_fields']
+
+    latencies = []
+    for i in range(warmup + iterations):
+        if i == warmup:
+            del app.phase_timings[:]
+        start = default_timer()
+        response = scenario.make_request(client, num_fields)
+        elapsed = default_timer() - start
+        if response.status_code >= 300:
+            raise RuntimeError('{} failed with {}: {}'.format(
+                scenario.name, response.status_code, response.data
+            ))
+        if i >= warmup:
+            latencies.append(elapsed)
+
+    phase_timings = app.phase_timings
+    phases = {}
+    for phase in sorted(set(p for timings in phase_timings for p in timings)):
+        phases[phase] = _mean([timings[phase] for timings in phase_timings
+                               if phase in timings])
+
+    latencies.sort()
+    return {
+        'name': scenario.name,
+        'iterations': iterations,
+        'throughput': iterations / sum(latencies),
+        'latency': {
+            'mean': _mean(latencies),
+            'min': latencies[0],
+            'p50': _percentile(latencies, 50),
+            'p95': _percentile(latencies, 95),
+            'max': latencies[-1],
+        },
+        'phases': phases,
+    }
+
+
+def run(iterations=200, warmup=10, name_filter=None):
+    """
+    Runs each scenario from :func:`build_scenarios` whose name contains
+    `name_filter`.
+
+    :returns: A JSON serializable dict with the `results` of each scenario,
+              and `meta` describing the environment they were run in.
+    """
+    results = [
+        run_scenario(scenario, iterations, warmup)
+        for scenario in build_scenarios()
+        if not name_filter or name_filter in scenario.name
+    ]
+    return {
+        'meta': {
+            'flump': flump.__version__,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'iterations': iterations,
+        },
+        'results': results,
+    }
+
+
+def _mean(values):
+    return sum(values) / float(len(values)) if values else None
+
+
+def _percentile(sorted_values, percent):
+    index = int(round((len(sorted_values) - 1) * percent / 100.0))
+    return sorted_values[index]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=200,
+                        help='Timed requests per scenario.')
+    parser.add_argument('--warmup', type=int, default=10,
+                        help='Untimed requests per scenario.')
+    parser.add_argument('--filter', dest='name_filter',
+                        help='Only run scenarios whose name contains this.')
+    parser.add_argument('--output', help='File to write the results to, '
+                                         'rather than stdout.')
+    args = parser.parse_args(argv)
+
+    results = run(args.iterations, args.warmup, args.name_filter)
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        sys.stdout.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
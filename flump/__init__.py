@@ -13,15 +13,18 @@
 
 import logging
 
-from flask import Blueprint, request
+from flask import Blueprint, Response, request
 from werkzeug.exceptions import MethodNotAllowed
 
 from .error_handlers import register_error_handlers
 from .methods import HttpMethods
 from .orm import OrmIntegration
 from .fetcher import Fetcher
+from .instrumentation import Instrumentation
+from .json_backends import StdlibJsonBackend
+from .metrics import EXPOSITION_MIMETYPE
 from .view import FlumpView, _FlumpMethodView
-from .web_utils import MIMETYPE  # noqa
+from .web_utils import MIMETYPE, request_cache  # noqa
 
 __version__ = "0.11.2"
 
@@ -37,26 +40,70 @@ class FlumpBlueprint(Blueprint):
     :param logging: If True, Provides some default logging. This logs the
                     request HTTP method, the kwargs passed to the view
                     endpoint, and the request JSON body.
+    :param warm_schemas: If True, the Schema classes for each FlumpView are
+                         built as the view is registered, rather than on the
+                         first request which uses them. See
+                         :func:`FlumpBlueprint.warm`.
+    :param json_backend: The backend used to encode all JSON responses. See
+                         :mod:`.json_backends`. Defaults to
+                         :class:`.json_backends.StdlibJsonBackend`.
+    :param executor: A :class:`concurrent.futures.Executor`, such as a
+                     `ThreadPoolExecutor`. If given, get_many requests count
+                     the entities on the executor while fetching the page, so
+                     Fetchers must be safe to use from multiple threads.
+    :param instrumentation: An :class:`.instrumentation.Instrumentation`. If
+                            given, the time taken by each phase of the
+                            requests handled by the views is recorded.
+    :param metrics: A :class:`.metrics.MetricsRegistry`. If given, the
+                    requests handled by the views are recorded in it, enabling
+                    instrumentation if no `instrumentation` is given.
+    :param metrics_url: If given along with `metrics`, a route is added at
+                        this URL which renders the metrics in the Prometheus
+                        text format.
 
     Adds the 'application/vnd.api+json' Content-Type header to all responses.
     """
     def __init__(self, *args, **kwargs):
+        self.warm_schemas = kwargs.pop('warm_schemas', False)
+        self.json_backend = (kwargs.pop('json_backend', None) or
+                             StdlibJsonBackend())
+        self.executor = kwargs.pop('executor', None)
+        self.instrumentation = kwargs.pop('instrumentation', None)
+        self.metrics = kwargs.pop('metrics', None)
+        metrics_url = kwargs.pop('metrics_url', None)
+        if self.metrics is not None and self.instrumentation is None:
+            self.instrumentation = Instrumentation(server_timing=False)
+        self.flump_views = []
+        logging_enabled = kwargs.pop('logging', False)
+
         super(FlumpBlueprint, self).__init__(*args, **kwargs)
 
         register_error_handlers(self)
 
-        if kwargs.pop('logging', False):
-            @self.before_request
-            def do_logging():
+        if self.instrumentation is not None:
+            self.after_request(self.instrumentation.after_request)
+
+        if self.metrics is not None and metrics_url:
+            self.add_url_rule(metrics_url, 'metrics', self.render_metrics)
+
+        if logging_enabled:
+            @self.after_request
+            def do_logging(response):
                 logger = logging.getLogger('flump.view.{}'.format(self.name))
+                if not logger.isEnabledFor(logging.DEBUG):
+                    return response
 
                 debug_string = (
                     "%s request made for resource type %s with kwargs: %s "
                     "and data: %s"
                 )
 
-                logger.debug(debug_string, request.method, request.view_args,
-                             request.data)
+                # Logs the body parsed by the view, if any, as reading it
+                # here would bypass the FLUMP_MAX_CONTENT_LENGTH check and
+                # consume bodies without a Content-Length.
+                logger.debug(debug_string, request.method, request.endpoint,
+                             request.view_args, request_cache().get('json'))
+                return response
 
     def register_flump_view(self, view_class, url):
         """
@@ -66,8 +113,13 @@ class FlumpBlueprint(Blueprint):
         :param flump_view: The :class:`.view.FlumpView` to register URLs for.
         """
         flump_view = view_class()
+        flump_view.flump_blueprint = self
+        self.flump_views.append(flump_view)
+        if self.warm_schemas:
+            flump_view.warm_schemas()
+
         view_func = _FlumpMethodView.as_view(
-            getattr(flump_view, 'VIEW_NAME', flump_view.RESOURCE_NAME),
+            flump_view._view_name,
             flump_view=flump_view
         )
         methods = flump_view.HTTP_METHODS
@@ -79,9 +131,10 @@ class FlumpBlueprint(Blueprint):
 
         url_mapping = flump_view.URL_MAPPING
 
-        def register_endpoint(flump_method, flask_method):
+        def register_endpoint(flump_method, flask_method, allowed=None):
             if flump_method in url_mapping:
-                func = view_func if flump_method <= methods else _meth_not_allowed
+                allowed = allowed or flump_method
+                func = view_func if allowed & methods else _meth_not_allowed
                 self.add_url_rule(
                     url_mapping[flump_method].format(url), methods=flask_method,
                     view_func=func, strict_slashes=False
@@ -89,9 +142,33 @@ class FlumpBlueprint(Blueprint):
 
         register_endpoint(HttpMethods.GET, ('GET', ))
         register_endpoint(HttpMethods.GET_MANY, ('GET', ))
-        register_endpoint(HttpMethods.POST, ('POST', ))
+        # Bulk POST requests are sent to the same URL as POST requests, and
+        # are dispatched by `Post.post`.
+        register_endpoint(HttpMethods.POST, ('POST', ),
+                          HttpMethods.POST | HttpMethods.BULK_POST)
         register_endpoint(HttpMethods.PATCH, ('PATCH', ))
         register_endpoint(HttpMethods.DELETE, ('DELETE', ))
+        register_endpoint(HttpMethods.BULK_PATCH, ('PATCH', ))
+        register_endpoint(HttpMethods.BULK_DELETE, ('DELETE', ))
+
+    def warm(self):
+        """
+        Builds the Schema classes for every FlumpView registered so far.
+
+        Calling this before the application server forks its workers (for
+        instance when using gunicorn's `--preload`) means the Schema classes
+        are built once and shared between all of the workers.
+        """
+        for flump_view in self.flump_views:
+            flump_view.warm_schemas()
+
+    def render_metrics(self):
+        """
+        :returns: A response containing the :attr:`FlumpBlueprint.metrics`
+                  in the Prometheus text exposition format.
+        """
+        return Response(self.metrics.render(self.flump_views),
+                        mimetype=EXPOSITION_MIMETYPE)
 
     def flump_view(self, url):
         """
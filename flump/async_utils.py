@@ -0,0 +1,66 @@
+import inspect
+import threading
+
+try:
+    import asyncio
+except ImportError:  # Python 2
+    asyncio = None
+
+_local = threading.local()
+
+
+def isawaitable(value):
+    """
+    :returns: Boolean indicating whether `value` is awaitable, for instance
+              the coroutine returned by calling an `async def` method.
+    """
+    if asyncio is None or not hasattr(inspect, 'isawaitable'):
+        return False
+    return inspect.isawaitable(value)
+
+
+def resolve(value):
+    """
+    :returns: The result of awaiting `value` if it is awaitable, otherwise
+              `value` itself.
+    """
+    return gather(value)[0]
+
+
+def gather(*values):
+    """
+    Resolves each of the given values as by :func:`resolve`, running all of
+    the awaitables concurrently on a single event loop.
+
+    Flump views are dispatched synchronously, so this must not be called from
+    a thread which is already running an event loop. Every call in a thread
+    uses the same loop, see :func:`get_event_loop`, so that connections and
+    pools created by async fetchers remain usable in later requests.
+
+    :returns: A list of the resolved values, in the same order.
+    """
+    indexes = [i for i, value in enumerate(values) if isawaitable(value)]
+    if not indexes:
+        return list(values)
+
+    loop = get_event_loop()
+    futures = [asyncio.ensure_future(values[i], loop=loop) for i in indexes]
+    results = loop.run_until_complete(asyncio.gather(*futures))
+
+    resolved = list(values)
+    for i, result in zip(indexes, results):
+        resolved[i] = result
+    return resolved
+
+
+def get_event_loop():
+    """
+    :returns: The event loop of the current thread, which is created on
+              first use and kept open for the lifetime of the thread. Threads
+              sharing a request, such as one counting the entities, each use
+              their own loop.
+    """
+    loop = getattr(_local, 'loop', None)
+    if loop is None or loop.is_closed():
+        loop = _local.loop = asyncio.new_event_loop()
+    return loop
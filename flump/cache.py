@@ -0,0 +1,213 @@
+from collections import OrderedDict
+from threading import Lock
+import time
+import uuid
+
+from .async_utils import resolve
+
+
+class LRUCache(object):
+    """
+    A bounded, thread safe mapping which evicts the least recently used entry
+    once `maxsize` entries are stored.
+
+    Keeps a count of `hits` and `misses` so that the effectiveness of the
+    cache can be monitored.
+
+    :param maxsize: The maximum number of entries to store.
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        """
+        :returns: The value stored under `key`, or `default` if there is no
+                  such entry.
+        """
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Stores `value` under `key`, evicting the least recently used entry if
+        the cache is full.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_create(self, key, factory):
+        """
+        :returns: The value stored under `key`. If there is no such entry then
+                  `factory` is called to create it, and the result is stored.
+        """
+        sentinel = _missing
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            # We build the value outside of the lock, so a slow factory does
+            # not block other threads. At worst two threads build the same
+            # value and the last one wins.
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        """
+        Removes all entries and resets the hit/miss counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class MemoryCacheBackend(object):
+    """
+    An in-process cache backend, storing at most `maxsize` entries and
+    expiring each entry after its timeout.
+
+    Cache backends must implement `get(key)`, returning None for missing
+    entries, and `set(key, value, timeout)`. This is the same interface as
+    the cachelib (formerly `werkzeug.contrib.cache`) caches, so any of those
+    may be used to share a cache between processes.
+
+    :param maxsize: The maximum number of entries to store.
+    """
+    def __init__(self, maxsize=1024):
+        self._cache = LRUCache(maxsize=maxsize)
+
+    def get(self, key):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires is not None and expires < time.time():
+            return None
+        return value
+
+    def set(self, key, value, timeout=None):
+        """
+        :param timeout: The number of seconds after which the entry expires.
+                        If None or 0 the entry does not expire.
+        """
+        expires = time.time() + timeout if timeout else None
+        self._cache.set(key, (expires, value))
+
+
+class CountCache(object):
+    """
+    Caches the total number of entities for a view, as returned by
+    :func:`.fetcher.Fetcher.get_total_entities`, keyed by the kwargs taken
+    from the url and any filters.
+
+    The cached totals for a view are invalidated whenever an entity is created
+    or deleted through that view.
+
+    :param timeout: The number of seconds a total is cached for.
+    :param backend: The cache backend used to store totals, see
+                    :class:`MemoryCacheBackend`. Defaults to an in-process
+                    :class:`MemoryCacheBackend`.
+    :param key_prefix: A prefix for all keys stored in the `backend`.
+    """
+    def __init__(self, timeout=60, backend=None, key_prefix='flump.count'):
+        self.timeout = timeout
+        self.backend = backend or MemoryCacheBackend()
+        self.key_prefix = key_prefix
+        self.hits = 0
+        self.misses = 0
+
+    def get_total(self, namespace, kwargs, count, query_spec=None):
+        """
+        :param namespace:  The name of the view being counted.
+        :param kwargs:     The kwargs taken from the url.
+        :param count:      Function called with `**kwargs` to count the
+                           entities if there is no cached total.
+        :param query_spec: The :class:`.query.QuerySpec` the entities are
+                           filtered by, if any.
+        :returns: The total number of entities.
+        """
+        key = '{}:{}:{}'.format(self._get_generation(namespace), namespace,
+                                sorted(kwargs.items()))
+        if query_spec is not None and query_spec.filters:
+            key = '{}:{!r}'.format(key, query_spec.filters)
+        total = self.backend.get(key)
+        if total is not None:
+            self.hits += 1
+            return total
+
+        self.misses += 1
+        total = resolve(count(**kwargs))
+        if total is not None:
+            self.backend.set(key, total, self.timeout)
+        return total
+
+    def invalidate(self, namespace):
+        """
+        Invalidates all cached totals for the view named `namespace`.
+        """
+        self._new_generation(namespace)
+
+    def _generation_key(self, namespace):
+        return '{}:generation:{}'.format(self.key_prefix, namespace)
+
+    def _get_generation(self, namespace):
+        """
+        Totals are stored under a generation which is replaced when the view's
+        totals are invalidated, as backends may not support deleting keys by
+        prefix. If the generation has been evicted a new one is started, so
+        at worst we recount.
+        """
+        return (self.backend.get(self._generation_key(namespace)) or
+                self._new_generation(namespace))
+
+    def _new_generation(self, namespace):
+        generation = '{}:{}'.format(self.key_prefix, uuid.uuid4().hex)
+        self.backend.set(self._generation_key(namespace), generation, 0)
+        return generation
+
+
+class CountCachingFetcher(object):
+    """
+    Wraps a :class:`.fetcher.Fetcher` so that calls to `get_total_entities`
+    use a :class:`CountCache`. All other attributes are taken from the wrapped
+    fetcher.
+
+    :param fetcher:     The :class:`.fetcher.Fetcher` to wrap.
+    :param count_cache: The :class:`CountCache` to use.
+    :param namespace:   The name of the view being counted.
+    """
+    def __init__(self, fetcher, count_cache, namespace):
+        self.fetcher = fetcher
+        self.count_cache = count_cache
+        self.namespace = namespace
+
+    def __getattr__(self, name):
+        return getattr(self.fetcher, name)
+
+    def get_total_entities(self, **kwargs):
+        return self.count_cache.get_total(
+            self.namespace, kwargs, self.fetcher.get_total_entities,
+            self.fetcher.query_spec
+        )
+
+
+_missing = object()
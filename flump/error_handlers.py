@@ -1,20 +1,17 @@
-from flask import jsonify
 from werkzeug.exceptions import (Unauthorized, NotFound, Conflict,
                                  PreconditionFailed, Forbidden,
                                  MethodNotAllowed, UnsupportedMediaType,
-                                 PreconditionRequired, BadRequest)
+                                 PreconditionRequired, BadRequest,
+                                 RequestEntityTooLarge)
 
 from .exceptions import FlumpUnprocessableEntity
-from .web_utils import MIMETYPE
-
-
-def jsonapiify(*args, **kwargs):
-    response = jsonify(*args, **kwargs)
-    response.headers['content-type'] = MIMETYPE
-    return response
+from .web_utils import make_json_response
 
 
 def register_error_handlers(blueprint):
+    def jsonapiify(**kwargs):
+        return make_json_response(kwargs, blueprint.json_backend)
+
     @blueprint.errorhandler(BadRequest)
     @blueprint.errorhandler(400)
     def bad_request(e):
@@ -50,6 +47,11 @@ def register_error_handlers(blueprint):
     def precondition_failed(e):
         return jsonapiify(message=str(e.description)), 412
 
+    @blueprint.errorhandler(RequestEntityTooLarge)
+    @blueprint.errorhandler(413)
+    def request_entity_too_large(e):
+        return jsonapiify(message=str(e.description)), 413
+
     @blueprint.errorhandler(UnsupportedMediaType)
     @blueprint.errorhandler(415)
     def unsupported_media_type(e):
@@ -1,22 +1,91 @@
+from flask import has_request_context
+
+from .async_utils import gather, resolve
+from .web_utils import request_cache
+
+
 class Fetcher(object):
     """
     Base Fetcher class. All :class:`flump.view.FlumpView` should
     have a `FETCHER` which inherits from this class and implements the
     necessary methods for their chosen HTTP methods.
+
+    On Python 3 any of the methods may be implemented with `async def`, in
+    which case the returned coroutine is awaited by the view.
     """
 
+    @property
+    def requested_fields(self):
+        """
+        The names of the entity attributes which will be serialized for the
+        current request, as restricted by a sparse fieldset, or None if all
+        attributes will be serialized.
+
+        Fetchers may use this to only load the requested columns in
+        :func:`Fetcher.get_entity` and :func:`Fetcher.get_many_entities`.
+        Entities must still provide their `id` and `etag`. When related
+        entities are included, the `attribute` of each included
+        :class:`.relationships.Relationship` is also requested.
+        """
+        if has_request_context():
+            return request_cache().get(('requested_fields', self))
+
+    @property
+    def query_spec(self):
+        """
+        The :class:`.query.QuerySpec` of the filters and sort requested for
+        the current get_many request, or None if the view does not declare
+        any `FILTERABLE_FIELDS` or `SORTABLE_FIELDS`.
+
+        Fetchers should apply this in :func:`Fetcher.get_many_entities`, and
+        in :func:`Fetcher.get_total_entities` so the total matches.
+        """
+        if has_request_context():
+            return request_cache().get(('query_spec', self))
+
     def get_total_entities(self, **kwargs):
         """
         :returns: Should return an integer of the total number of entities.
         """
         raise NotImplementedError
 
+    def estimate_total_entities(self, **kwargs):
+        """
+        Optional. Used instead of :func:`Fetcher.get_total_entities` by views
+        using the :data:`.pagination.TotalCount.ESTIMATE` policy, for
+        instance to read a table statistics estimate rather than running a
+        full count.
+
+        :returns: An estimate of the total number of entities, or None if no
+                  estimate is available.
+        """
+        return None
+
     def get_many_entities(self, pagination_args, **kwargs):
         """
         :returns: Should return an iterable of entities.
         """
         raise NotImplementedError
 
+    def get_collection_etag(self, pagination_args, **kwargs):
+        """
+        Optional. Used to answer conditional get_many requests without loading
+        the entities, for instance from the latest modification time and
+        number of the entities in the collection.
+
+        The returned value must change whenever any entity on the page
+        described by `pagination_args` changes, or the page would contain
+        different entities.
+
+        :param pagination_args: The pagination args for the request, as
+                                passed to :func:`Fetcher.get_many_entities`.
+        :param \**kwargs: kwargs taken from the url used for specifying the
+                          entities.
+        :returns: A value identifying the state of the collection, or None
+                  if it can not be determined cheaply.
+        """
+        return None
+
     def get_entity(self, entity_id=None, **kwargs):
         """
         Should provide a method of retrieving a single entity given the
@@ -28,3 +97,92 @@ class Fetcher(object):
         :returns: The entity identified by `entity_id` and `**kwargs`.
         """
         raise NotImplementedError
+
+    def get_entity_etag(self, entity_id=None, **kwargs):
+        """
+        Optional. Used to answer conditional GET requests without loading the
+        entity, for instance by selecting only its etag column.
+
+        The returned value must be the same as the etag of the entity returned
+        by :func:`Fetcher.get_entity`.
+
+        :param entity_id: The id of the entity.
+        :param \**kwargs: Any other kwargs taken from the url which are used
+                          for identifying the entity.
+        :returns: The etag of the entity identified by `entity_id` and
+                  `**kwargs`, or None if it does not exist or the etag can
+                  not be looked up cheaply.
+        """
+        return None
+
+    def get_entities(self, entity_ids, **kwargs):
+        """
+        Optional. Used to retrieve many entities by id in a single call, for
+        instance with a `WHERE id IN (...)` query. Defaults to calling
+        :func:`Fetcher.get_entity` for each id.
+
+        :param entity_ids: A list of the ids of the entities to retrieve.
+        :param \**kwargs: Any other kwargs taken from the url which are used
+                          for identifying the entities to be retrieved.
+        :returns: A list of the entities in the same order as `entity_ids`,
+                  with None in place of any entity which does not exist.
+        """
+        return gather(*[self.get_entity(entity_id, **kwargs)
+                        for entity_id in entity_ids])
+
+
+class MemoizingFetcherMixin(object):
+    """
+    Mixed in to the `FETCHER` of views which set
+    :data:`.view.FlumpView.MEMOIZE_ENTITIES`, so that
+    :func:`Fetcher.get_entity` and :func:`Fetcher.get_entities` retrieve each
+    entity at most once per request. Entities are memoized by their id and
+    the kwargs taken from the url.
+    """
+    def get_entity(self, entity_id=None, **kwargs):
+        memo = self._get_entity_memo()
+        if memo is None:
+            return super(MemoizingFetcherMixin, self).get_entity(
+                entity_id=entity_id, **kwargs
+            )
+
+        key = _memo_key(entity_id, kwargs)
+        if key not in memo:
+            memo[key] = resolve(super(MemoizingFetcherMixin, self).get_entity(
+                entity_id=entity_id, **kwargs
+            ))
+        return memo[key]
+
+    def get_entities(self, entity_ids, **kwargs):
+        memo = self._get_entity_memo()
+        if memo is None:
+            return super(MemoizingFetcherMixin, self).get_entities(
+                entity_ids, **kwargs
+            )
+
+        missing = [entity_id for entity_id in entity_ids
+                   if _memo_key(entity_id, kwargs) not in memo]
+        if missing:
+            entities = resolve(super(MemoizingFetcherMixin, self).get_entities(
+                missing, **kwargs
+            ))
+            for entity_id, entity in zip(missing, entities):
+                memo[_memo_key(entity_id, kwargs)] = entity
+        return [memo[_memo_key(entity_id, kwargs)]
+                for entity_id in entity_ids]
+
+    def invalidate_entities(self):
+        """
+        Forgets all entities memoized for the current request.
+        """
+        memo = self._get_entity_memo()
+        if memo is not None:
+            memo.clear()
+
+    def _get_entity_memo(self):
+        if has_request_context():
+            return request_cache().setdefault(('entities', self), {})
+
+
+def _memo_key(entity_id, kwargs):
+    return str(entity_id), tuple(sorted(kwargs.items()))
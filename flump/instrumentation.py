@@ -0,0 +1,157 @@
+from collections import OrderedDict
+from timeit import default_timer
+
+from flask import request
+
+from .web_utils import request_cache
+
+
+class Instrumentation(object):
+    """
+    Hooks for instrumenting the requests handled by the views of a
+    :class:`flump.FlumpBlueprint`, passed as its `instrumentation` kwarg.
+
+    While instrumentation is enabled the time taken by each phase of a
+    request is recorded in a :class:`RequestTimings`. The phases are:
+
+    - `pagination`: getting the pagination args.
+    - `count`: counting the entities.
+    - `fetch`: retrieving entities from the fetcher.
+    - `load`: validating and deserializing the request data.
+    - `write`: creating, updating or deleting entities through the
+      ORM integration.
+    - `build`: building the :class:`.schemas.EntityData` for each entity.
+    - `dump`: serializing the response data.
+    - `encode`: encoding the response JSON.
+    - `total`: the whole request, including any time not in another phase.
+
+    Phases which are not part of a request are omitted. Subclasses may
+    override :func:`Instrumentation.request_finished` to feed the timings to
+    a metrics collector. The timings are also recorded in the
+    :class:`.metrics.MetricsRegistry` of the FlumpBlueprint, if it has one.
+
+    :param server_timing: Whether to report the timings to clients in a
+                          `Server-Timing` response header.
+    """
+    def __init__(self, server_timing=True):
+        self.server_timing = server_timing
+
+    def request_finished(self, timings, response):
+        """
+        Called once a request handled by a view has finished, with the
+        response about to be returned. Does nothing by default.
+
+        :param timings:  The :class:`RequestTimings` for the request.
+        :param response: The :class:`flask.Response`.
+        """
+
+    def after_request(self, response):
+        """
+        Registered as an `after_request` function of the FlumpBlueprint.
+        Completes the timings of the request if it was handled by a view.
+        """
+        timings = get_request_timings()
+        if timings is None:
+            return response
+
+        timings.finish()
+        metrics = getattr(timings.flump_view.flump_blueprint, 'metrics', None)
+        if metrics is not None:
+            metrics.record_request(timings, response)
+        self.request_finished(timings, response)
+        if self.server_timing:
+            response.headers['Server-Timing'] = timings.server_timing()
+        return response
+
+
+class RequestTimings(object):
+    """
+    The time taken by each phase of a request, see :class:`Instrumentation`.
+
+    :param flump_view: The :class:`.view.FlumpView` handling the request.
+    :param method:     The HTTP method of the request.
+    """
+    def __init__(self, flump_view, method):
+        self.flump_view = flump_view
+        self.method = method
+        #: The total duration in seconds of each phase, in the order the
+        #: phases were first entered.
+        self.durations = OrderedDict()
+        #: The number of times each phase was entered, so `build` is the
+        #: number of entities serialized.
+        self.counts = {}
+        self._start = default_timer()
+
+    def time(self, phase):
+        """
+        :returns: A context manager which adds the time spent within it to
+                  the duration of `phase`.
+        """
+        return _PhaseTimer(self, phase)
+
+    def add(self, phase, duration):
+        """
+        Adds `duration` seconds to the duration of `phase`.
+        """
+        self.durations[phase] = self.durations.get(phase, 0) + duration
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+
+    def finish(self):
+        """
+        Records the `total` duration of the request.
+        """
+        self.durations['total'] = default_timer() - self._start
+
+    def server_timing(self):
+        """
+        :returns: The value of the `Server-Timing` header for the timings,
+                  with durations in milliseconds.
+        """
+        return ', '.join('{};dur={:.3f}'.format(phase, duration * 1000)
+                         for phase, duration in self.durations.items())
+
+
+def start_request_timings(flump_view):
+    """
+    Starts recording the timings of the current request, which is being
+    handled by `flump_view`.
+
+    :returns: The :class:`RequestTimings`.
+    """
+    timings = RequestTimings(flump_view, request.method)
+    request_cache()['timings'] = timings
+    return timings
+
+
+def get_request_timings():
+    """
+    :returns: The :class:`RequestTimings` of the current request, or None if
+              it is not being instrumented.
+    """
+    return request_cache().get('timings')
+
+
+class _PhaseTimer(object):
+    def __init__(self, timings, phase):
+        self.timings = timings
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = default_timer()
+
+    def __exit__(self, *exc_info):
+        self.timings.add(self.phase, default_timer() - self.start)
+
+
+class _NullTimer(object):
+    """
+    Stands in for a :class:`_PhaseTimer` when instrumentation is disabled.
+    """
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+NULL_TIMER = _NullTimer()
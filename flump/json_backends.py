@@ -0,0 +1,65 @@
+from datetime import date
+from decimal import Decimal
+import uuid
+
+from flask import json
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    """
+    Encodes the same extra types as Flask's JSONEncoder, for backends which
+    do not use it.
+    """
+    if isinstance(obj, date):
+        return http_date(obj)
+    if isinstance(obj, (uuid.UUID, Decimal)):
+        return str(obj)
+    if hasattr(obj, '__html__'):
+        return obj.__html__()
+    raise TypeError('{!r} is not JSON serializable'.format(obj))
+
+
+class StdlibJsonBackend(object):
+    """
+    Encodes JSON without any whitespace using Flask's `json` module, so any
+    types handled by the app's JSON encoder or provider are supported, as
+    with :func:`flask.jsonify`.
+
+    JSON backends must implement `dumps(obj)`, returning the encoded JSON as
+    bytes.
+    """
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+class OrjsonBackend(object):
+    """
+    Encodes JSON using `orjson <https://github.com/ijl/orjson>`_, which must
+    be installed separately.
+    """
+    def __init__(self):
+        if orjson is None:
+            raise RuntimeError('orjson must be installed to use OrjsonBackend')
+
+    def dumps(self, obj):
+        # We pass datetimes through to `_default` so they are encoded in the
+        # same way as by the other backends, and allow non string keys such
+        # as the indexes of errors in bulk requests, as the stdlib does.
+        return orjson.dumps(obj, default=_default,
+                            option=(orjson.OPT_PASSTHROUGH_DATETIME |
+                                    orjson.OPT_NON_STR_KEYS))
+
+
+def best_available():
+    """
+    :returns: An instance of the fastest JSON backend which is installed.
+    """
+    if orjson is not None:
+        return OrjsonBackend()
+    return StdlibJsonBackend()
@@ -6,6 +6,15 @@ class HttpMethods(object):
     - `ALL` allows use of all HTTP verbs for the FlumpView.
     - `READ_ONLY` allows use of only GET and GET_MANY for the FlumpView.
 
+    Bulk methods, which operate on many entities in a single request, are not
+    included in `ALL` and must be enabled explicitly:
+    - `BULK_POST` allows creating many entities by POSTing an array of
+      resources to the collection URL.
+    - `BULK_PATCH` allows updating many entities by PATCHing an array of
+      resources to the collection URL.
+    - `BULK_DELETE` allows deleting many entities by sending an array of
+      resource identifiers in a DELETE to the collection URL.
+
     When creating a FlumpView we can combine only the HTTP methods we wish to
     use, for instance to allow only GET and POST requests we would define:
 
@@ -16,6 +25,9 @@ class HttpMethods(object):
     POST = frozenset({'POST'})
     PATCH = frozenset({'PATCH'})
     DELETE = frozenset({'DELETE'})
+    BULK_POST = frozenset({'BULK_POST'})
+    BULK_PATCH = frozenset({'BULK_PATCH'})
+    BULK_DELETE = frozenset({'BULK_DELETE'})
 
     ALL = frozenset({'GET', 'GET_MANY', 'POST', 'PATCH', 'DELETE'})
     READ_ONLY = frozenset({'GET', 'GET_MANY'})
@@ -1,5 +1,11 @@
+from flask import request
 from werkzeug.exceptions import NotFound
 
+from ..async_utils import resolve
+from ..exceptions import FlumpUnprocessableEntity
+from ..schemas import ResourceIdentifierSchema, make_bulk_entity_schema
+from ..web_utils import get_json
+
 
 class Delete(object):
     def delete(self, entity_id=None, **kwargs):
@@ -8,15 +14,75 @@ class Delete(object):
 
         Verifies that the etag is valid for deletion then deletes the entity
         with the given entity_id using
-        :func:`flump.view.FlumpView.delete_entity`
+        :func:`flump.view.FlumpView.delete_entity`, or atomically checks the
+        etag and deletes the entity using
+        :func:`flump.orm.OrmIntegration.delete_entity_if_match`.
 
         :param entity_id: The id of the entity to be deleted.
         :param \**kwargs: Any other kwargs taken from the url which are used
                           for identifying the entity to be deleted.
         """
-        entity = self.fetcher.get_entity(entity_id, **kwargs)
-        if not entity:
-            raise NotFound
-        self._verify_etag(entity)
-        self.orm_integration.delete_entity(entity)
+        if entity_id is None:
+            return self.delete_many(**kwargs)
+
+        deleted = NotImplemented
+        if (request.headers.get('If-Match') and
+                self._implements_orm_hook('delete_entity_if_match')):
+            with self._time('write'):
+                deleted = resolve(self.orm_integration.delete_entity_if_match(
+                    entity_id, request.if_match, **kwargs
+                ))
+
+        if deleted is NotImplemented:
+            with self._time('fetch'):
+                entity = resolve(self.fetcher.get_entity(entity_id, **kwargs))
+            if not entity:
+                raise NotFound
+            self._verify_etag(entity)
+            with self._time('write'):
+                resolve(self.orm_integration.delete_entity(entity))
+        elif not deleted:
+            self._raise_for_failed_match(entity_id, **kwargs)
+
+        self._invalidate_total_count()
+        self._invalidate_entities()
         return '', 204
+
+    def delete_many(self, **kwargs):
+        """
+        Handles HTTP DELETE requests to the collection URL, where `data` is an
+        array of resource identifiers each with an `id` and `meta.etag`.
+
+        All of the entities are retrieved using
+        :func:`flump.fetcher.Fetcher.get_entities` and their etags verified
+        before any are deleted using
+        :func:`flump.orm.OrmIntegration.delete_entities`.
+
+        :param \**kwargs: Any other kwargs taken from the url which are used
+                          for identifying the entities to be deleted.
+        """
+        request_data = get_json()
+        with self._time('load'):
+            identifiers, errors = self._bulk_delete_schema().load(
+                request_data
+            )
+        if errors:
+            raise FlumpUnprocessableEntity(errors=errors)
+
+        entities = self._get_bulk_entities(
+            [identifier.id for identifier in identifiers],
+            self._get_bulk_etags(request_data), **kwargs
+        )
+        with self._time('write'):
+            resolve(self.orm_integration.delete_entities(entities))
+        self._invalidate_total_count()
+        self._invalidate_entities()
+        return '', 204
+
+    @property
+    def _bulk_delete_schema(self):
+        """
+        A schema describing the format of bulk DELETE requests.
+        """
+        return make_bulk_entity_schema(self.SCHEMA, self.RESOURCE_NAME,
+                                       ResourceIdentifierSchema)
@@ -1,6 +1,12 @@
-from flask import jsonify, request
+import hashlib
+from timeit import default_timer
 
+from flask import request, Response, stream_with_context
+from werkzeug.exceptions import BadRequest
+
+from ..async_utils import isawaitable, resolve
 from ..schemas import ManyResponseData, make_response_schema
+from ..web_utils import MIMETYPE
 
 
 class GetMany(object):
@@ -13,20 +19,206 @@ class GetMany(object):
         :func:`flump.view.FlumpView.get_total_entities` to be implemented in
         order to provide the total count.
 
+        The response has an etag derived from the etags of the entities on
+        the page, or from :func:`flump.fetcher.Fetcher.get_collection_etag`
+        if implemented, in which case a matching If-None-Match header returns
+        a 304 (Not Modified) without loading the entities.
+
+        Entities related through the relationships named in the `include`
+        query param are added to the `included` member of the response. As
+        the etag must then also reflect the included entities,
+        `get_collection_etag` is not used.
+
+        Any `filter[...]` and `sort` query params are validated against the
+        view's `FILTERABLE_FIELDS` and `SORTABLE_FIELDS`, and provided to the
+        fetcher as :attr:`flump.fetcher.Fetcher.query_spec`.
+
+        If an `executor` is configured on the FlumpBlueprint, the entities are
+        counted on it while the page is fetched. Likewise if the fetcher
+        implements both `get_many_entities` and `get_total_entities` with
+        `async def`, they are awaited concurrently.
+
+        If `'id'` is in the view's `FILTERABLE_FIELDS` and a `filter[id]`
+        query param is given, only the entities with those ids are returned,
+        see :func:`GetMany._get_many_by_id`.
+
         :param \**kwargs: kwargs taken from the url used for specifying the
                           entities to be returned.
         """
-        pagination_args = self.paginator.get_pagination_args()
-        entities = [
-            self._build_entity_data(entity) for entity
-            in self.fetcher.get_many_entities(pagination_args, **kwargs)
-        ]
+        includes = self._get_includes()
+        entity_ids = self._get_id_filter()
+        if entity_ids is not None:
+            return self._get_many_by_id(entity_ids, includes, **kwargs)
+
+        self._set_query_spec()
+        context = self.paginator.get_context(**kwargs)
+        with self._time('pagination'):
+            pagination_args = context.args
+
+        etag = None
+        if not includes:
+            # The etag of a compound document must also depend on the
+            # included entities, so is derived once they are loaded.
+            with self._time('fetch'):
+                etag = resolve(
+                    self.fetcher.get_collection_etag(pagination_args, **kwargs)
+                )
+        if etag is not None:
+            etag = self._make_collection_etag(pagination_args, str(etag))
+            if etag in request.if_none_match:
+                return '', 304
+
+        self._set_requested_fields(includes)
+        if self.executor is not None:
+            context.prefetch_total(self.executor)
+
+        start = default_timer()
+        with self._time('fetch'):
+            entities = self.fetcher.get_many_entities(pagination_args,
+                                                      **kwargs)
+            if isawaitable(entities):
+                entities = context.resolve_with_total(entities)
+        if self.STREAM_GET_MANY:
+            response, status = self._stream_get_many(entities, includes,
+                                                     **kwargs)
+            if etag is not None:
+                response.set_etag(etag)
+            return response, status
+
+        entities = [self._build_entity_data(entity) for entity in entities]
+        context.timings['page'] = default_timer() - start
+        for entity_data in entities:
+            includes.add(entity_data.attributes)
+
+        if etag is None:
+            etag = self._make_collection_etag(
+                pagination_args, [e.meta.etag for e in entities],
+                context.total, includes.etags()
+            )
+            if etag in request.if_none_match:
+                return '', 304
 
         data = self._make_get_many_response(entities, **kwargs)
+        self._add_timing('count', context.timings.get('count'))
+
+        with self._time('dump'):
+            response_data = self.serializer.dump_many(data)
+        includes.update_document(response_data,
+                                 [e.attributes for e in entities])
+
+        response = self._make_json_response(response_data)
+        response.set_etag(etag)
+        return response, 200
+
+    def _get_many_by_id(self, entity_ids, includes, **kwargs):
+        """
+        Handles get_many requests filtered by id, retrieving the entities in
+        a single call to :func:`flump.fetcher.Fetcher.get_entities`. The
+        entities are returned in the order their ids were given, ids which
+        do not exist are skipped and no pagination is applied.
+        """
+        self._set_requested_fields(includes)
+        with self._time('fetch'):
+            entities = resolve(self.fetcher.get_entities(entity_ids,
+                                                         **kwargs))
+        entities = [self._build_entity_data(entity)
+                    for entity in entities if entity]
+        for entity_data in entities:
+            includes.add(entity_data.attributes)
+
+        etag = self._make_collection_etag([e.meta.etag for e in entities],
+                                          includes.etags())
+        if etag in request.if_none_match:
+            return '', 304
+
+        data = ManyResponseData(entities, {'self': request.url},
+                                {'total_count': len(entities)})
+        with self._time('dump'):
+            response_data = self.serializer.dump_many(data)
+        includes.update_document(response_data,
+                                 [e.attributes for e in entities])
+        response = self._make_json_response(response_data)
+        response.set_etag(etag)
+        return response, 200
 
-        response_data, _ = self._many_response_schema(strict=True).dump(data)
+    def _get_id_filter(self):
+        """
+        :returns: The list of ids given by a `filter[id]` query param, without
+                  duplicates, or None if the param was not given or the view
+                  does not allow filtering on `id`.
+        :raises BadRequest: If more ids are given than the `MAX_PAGE_SIZE` of
+                            the paginator.
+        """
+        if 'id' not in self.FILTERABLE_FIELDS:
+            return None
+        entity_ids = request.args.get('filter[id]')
+        if entity_ids is None:
+            return None
+
+        unique_ids, seen = [], set()
+        for entity_id in entity_ids.split(','):
+            if entity_id and entity_id not in seen:
+                seen.add(entity_id)
+                unique_ids.append(entity_id)
+
+        max_ids = self.paginator.MAX_PAGE_SIZE
+        if len(unique_ids) > max_ids:
+            raise BadRequest(
+                'filter[id] may not contain more than {} ids'.format(max_ids)
+            )
+        return unique_ids
+
+    def _make_collection_etag(self, *parts):
+        """
+        Builds the etag for a get_many response by hashing the given `parts`
+        along with the query string, which determines the entities and the
+        fields they are dumped with.
 
-        response = jsonify(response_data)
+        :param \*parts: Values identifying the state of the collection, such
+                        as the pagination args.
+        :returns: The etag string.
+        """
+        key = repr((request.query_string, ) + parts)
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _stream_get_many(self, entities, includes, **kwargs):
+        """
+        Streams the response to a get_many request, consuming the `entities`
+        iterable lazily and emitting each entity as it is dumped, so the
+        whole page is never held in memory.
+
+        The links and meta are emitted after the data, as paginators may
+        require the entities on the page to build them. As the status has
+        already been sent, any error while streaming truncates the response.
+        """
+        dump_entity = self.serializer.make_entity_dumper()
+        dumps = self.json_backend.dumps
+        page = _StreamedPage()
+
+        def generate():
+            yield b'{"data":['
+            for entity in entities:
+                entity_data = self._build_entity_data(entity)
+                resource = dump_entity(entity_data)
+                includes.add(entity)
+                includes.link(entity, resource)
+                if page:
+                    yield b','
+                yield dumps(resource)
+                page.append(entity_data)
+
+            data = self._make_get_many_response(page, **kwargs)
+            response_data = self.serializer.dump_many(data._replace(data=[]))
+            del response_data['data']
+            if includes:
+                response_data['included'] = includes.dump()
+            yield b']'
+            for key in sorted(response_data):
+                yield b',' + dumps(key) + b':' + dumps(response_data[key])
+            yield b'}'
+
+        response = Response(stream_with_context(generate()),
+                            mimetype=MIMETYPE)
         return response, 200
 
     @property
@@ -35,10 +227,41 @@ class GetMany(object):
                                     only=self._get_sparse_fieldset())
 
     def _make_get_many_response(self, entity_data, **kwargs):
+        meta = {}
+        total = self.paginator.get_context(**kwargs).total
+        if total is not None:
+            meta['total_count'] = total
+
         return self.paginator.transform_get_many_response(
-            ManyResponseData(
-                entity_data, {'self': request.url},
-                {'total_count': self.fetcher.get_total_entities(**kwargs)}
-            ),
+            ManyResponseData(entity_data, {'self': request.url}, meta),
             **kwargs
         )
+
+
+class _StreamedPage(object):
+    """
+    Stands in for the list of :class:`.schemas.EntityData` passed to
+    paginators when streaming a get_many response. Only the first and last
+    entities are kept, which is enough for paginators to build their links.
+    """
+    def __init__(self):
+        self._length = 0
+        self._first = self._last = None
+
+    def append(self, entity_data):
+        if not self._length:
+            self._first = entity_data
+        self._last = entity_data
+        self._length += 1
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if self._length and index == 0:
+            return self._first
+        if self._length and index == -1:
+            return self._last
+        raise IndexError(
+            'Only the first and last entities of a streamed page are kept.'
+        )
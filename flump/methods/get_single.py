@@ -1,6 +1,7 @@
-from flask import jsonify, request
+from flask import request
 from werkzeug.exceptions import NotFound
 
+from ..async_utils import resolve
 from ..schemas import ResponseData
 
 
@@ -9,29 +10,55 @@ class GetSingle(object):
         """
         Handles HTTP GET requests where a entity is specified.
 
-        If an etag is provided and matches the current etag, returns a 304 (Not
-        Modfied).
+        If an etag is provided in the If-None-Match or If-Match header and
+        matches the current etag, returns a 304 (Not Modfied). The current
+        etag is first looked up with
+        :func:`flump.fetcher.Fetcher.get_entity_etag`, so the entity is only
+        loaded if that is not implemented or the etag does not match. When
+        related entities are included the etag is also derived from theirs,
+        so the entity is always loaded.
 
         Otherwise dumps the retrieved entity to JSON based on the current
         schema and returns it.
 
+        Entities related through the relationships named in the `include`
+        query param are added to the `included` member of the response.
+
         :param entity_id: The entity_id used to retrieve the entity using
                           :func:`flump.view.FlumpView.get_entity`
         :param \**kwargs: Any other kwargs taken from the url which are used
                           for identifying the entity to retrieve.
         """
-        entity = self.fetcher.get_entity(entity_id=entity_id, **kwargs)
+        includes = self._get_includes()
+        if not includes and (request.if_none_match or request.if_match):
+            # Try to answer a conditional request without loading the entity.
+            with self._time('fetch'):
+                etag = resolve(self.fetcher.get_entity_etag(
+                    entity_id=entity_id, **kwargs
+                ))
+            if etag is not None and self._not_modified(str(etag)):
+                return '', 304
+
+        self._set_requested_fields(includes)
+        with self._time('fetch'):
+            entity = resolve(
+                self.fetcher.get_entity(entity_id=entity_id, **kwargs)
+            )
         if not entity:
             raise NotFound
 
-        if self._etag_matches(entity):
+        includes.add(entity)
+        etag = includes.make_etag(self._get_etag(entity))
+        if self._not_modified(etag):
             return '', 304
 
         entity_data = self._build_entity_data(entity)
-        response_data, _ = self.response_schema(strict=True).dump(
-            ResponseData(entity_data, {'self': request.url})
-        )
+        with self._time('dump'):
+            response_data = self.serializer.dump(
+                ResponseData(entity_data, {'self': request.url})
+            )
+        includes.update_document(response_data, [entity])
 
-        response = jsonify(response_data)
-        response.set_etag(str(entity_data.meta.etag))
+        response = self._make_json_response(response_data)
+        response.set_etag(etag)
         return response, 200
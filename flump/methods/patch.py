@@ -1,8 +1,10 @@
-from flask import jsonify, request
+from flask import request
 from werkzeug.exceptions import NotFound
 
+from ..async_utils import resolve
 from ..exceptions import FlumpUnprocessableEntity
-from ..schemas import ResponseData, make_data_schema, make_entity_schema
+from ..schemas import (ResponseData, make_bulk_entity_schema,
+                       make_data_schema, make_entity_schema)
 from ..web_utils import get_json
 
 
@@ -13,32 +15,118 @@ class Patch(object):
 
         Updates an entity based on the current schema and request json. The
         view should provide a method for updating the entity using
-        :func:`Patch.update_entity`.
+        :func:`Patch.update_entity`, or atomically check the etag and update
+        the entity using
+        :func:`flump.orm.OrmIntegration.update_entity_if_match`.
 
         :param entity_id: The entity_id used to retrieve the entity using
                           :func:`flump.view.FlumpView.get_entity`
         :param \**kwargs: Any other kwargs taken from the url which are used
                           for identifying the entity to patch.
         """
-        entity = self.fetcher.get_entity(entity_id, **kwargs)
-        if not entity:
-            raise NotFound
-        self._verify_etag(entity)
+        if entity_id is None:
+            return self.patch_many(**kwargs)
 
-        incoming_data, errors = self._patch_schema().load(self.patch_data)
-        if errors:
-            raise FlumpUnprocessableEntity(errors=errors)
+        incoming_data = None
+        entity = NotImplemented
+        if (request.headers.get('If-Match') and
+                self._implements_orm_hook('update_entity_if_match')):
+            incoming_data = self._load_patch_data()
+            with self._time('write'):
+                entity = resolve(self.orm_integration.update_entity_if_match(
+                    entity_id, request.if_match, incoming_data.attributes,
+                    **kwargs
+                ))
+
+        if entity is NotImplemented:
+            with self._time('fetch'):
+                entity = resolve(self.fetcher.get_entity(entity_id, **kwargs))
+            if not entity:
+                raise NotFound
+            self._verify_etag(entity)
+
+            if incoming_data is None:
+                incoming_data = self._load_patch_data()
+            with self._time('write'):
+                entity = resolve(self.orm_integration.update_entity(
+                    entity, incoming_data.attributes
+                ))
+        elif entity is None:
+            self._raise_for_failed_match(entity_id, **kwargs)
+
+        self._invalidate_entities()
+        self._invalidate_filtered_total_count()
 
-        entity = self.orm_integration.update_entity(entity,
-                                                    incoming_data.attributes)
         entity_data = self._build_entity_data(entity)
         response_data = ResponseData(entity_data, {'self': request.url})
 
-        data, _ = self.response_schema(strict=True).dump(response_data)
-        response = jsonify(data)
+        with self._time('dump'):
+            data = self.serializer.dump(response_data)
+        response = self._make_json_response(data)
         response.set_etag(str(entity_data.meta.etag))
         return response, 200
 
+    def patch_many(self, **kwargs):
+        """
+        Handles HTTP PATCH requests to the collection URL, where `data` is an
+        array of resources each with an `id`, `meta.etag` and `attributes`.
+
+        All of the entities are retrieved using
+        :func:`flump.fetcher.Fetcher.get_entities` and their etags verified
+        before any are updated using
+        :func:`flump.orm.OrmIntegration.update_entities`.
+
+        :param \**kwargs: Any other kwargs taken from the url which are used
+                          for identifying the entities to patch.
+        """
+        request_data = self.patch_data
+        with self._time('load'):
+            incoming_data, errors = self._bulk_patch_schema().load(
+                request_data
+            )
+        if errors:
+            raise FlumpUnprocessableEntity(errors=errors)
+
+        entities = self._get_bulk_entities(
+            [resource.id for resource in incoming_data],
+            self._get_bulk_etags(request_data), **kwargs
+        )
+        with self._time('write'):
+            entities = resolve(self.orm_integration.update_entities(
+                [(entity, resource.attributes)
+                 for entity, resource in zip(entities, incoming_data)]
+            ))
+        self._invalidate_entities()
+        self._invalidate_filtered_total_count()
+
+        entity_data = [self._build_entity_data(entity) for entity in entities]
+        with self._time('dump'):
+            data = self.serializer.dump_many(
+                ResponseData(entity_data, {'self': request.url})
+            )
+        return self._make_json_response(data), 200
+
+    @property
+    def _bulk_patch_schema(self):
+        """
+        Builds a schema for bulk PATCH requests. As each resource may specify
+        different attributes the resource_schema is `partial`.
+        """
+        return make_bulk_entity_schema(
+            self.SCHEMA, self.RESOURCE_NAME,
+            make_data_schema(self.SCHEMA, id_required=True, partial=True)
+        )
+
+    def _load_patch_data(self):
+        """
+        Loads the request json using the PATCH schema.
+        """
+        with self._time('load'):
+            incoming_data, errors = self._patch_schema().load(self.patch_data)
+        if errors:
+            raise FlumpUnprocessableEntity(errors=errors)
+        return incoming_data
+
     @property
     def _patch_schema(self):
         """
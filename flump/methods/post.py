@@ -1,8 +1,10 @@
-from flask import jsonify
-from werkzeug.exceptions import Forbidden
+from flask import request
+from werkzeug.exceptions import Forbidden, MethodNotAllowed
 
+from ..async_utils import resolve
 from ..exceptions import FlumpUnprocessableEntity
-from ..schemas import ResponseData, make_data_schema, make_entity_schema
+from ..schemas import (ResponseData, make_bulk_entity_schema,
+                       make_data_schema, make_entity_schema)
 from ..web_utils import get_json, url_for
 from .defs import HttpMethods
 
@@ -16,10 +18,19 @@ class Post(object):
         view should provide a method for creating the entity using
         :func:`Post.create_entity`
 
+        If the view allows :data:`HttpMethods.BULK_POST` and `data` is an
+        array of resources, dispatches to :func:`Post.post_many`.
+
         :param \**kwargs: Any kwargs taken from the url which are used
                           for building the url identifying the new entity.
         """
-        incoming_data, errors = self._post_schema().load(self.post_data)
+        if self._is_bulk_request():
+            return self.post_many(**kwargs)
+        if not HttpMethods.POST <= self.HTTP_METHODS:
+            raise MethodNotAllowed
+
+        with self._time('load'):
+            incoming_data, errors = self._post_schema().load(self.post_data)
         if errors:
             raise FlumpUnprocessableEntity(errors=errors)
 
@@ -28,9 +39,12 @@ class Post(object):
                 'You must not specify an id when creating an entity'
             )
 
-        new_model = self.orm_integration.create_entity(
-            incoming_data.attributes
-        )
+        with self._time('write'):
+            new_model = resolve(self.orm_integration.create_entity(
+                incoming_data.attributes
+            ))
+        self._invalidate_total_count()
+        self._invalidate_entities()
 
         entity_data = self._build_entity_data(new_model)
 
@@ -42,17 +56,73 @@ class Post(object):
                                **kwargs)
             links = {'self': self_url}
 
-        schema = self.response_schema(strict=True)
-        response_data = ResponseData(entity_data, links)
-        data, _ = schema.dump(response_data)
+        with self._time('dump'):
+            data = self.serializer.dump(ResponseData(entity_data, links))
 
-        response = jsonify(data)
+        response = self._make_json_response(data)
         if self_url:
             response.headers['Location'] = self_url
 
         response.set_etag(str(entity_data.meta.etag))
         return response, 201
 
+    def post_many(self, **kwargs):
+        """
+        Handles HTTP POST requests where `data` is an array of resources.
+
+        All of the resources are validated before any entity is created. If
+        any are invalid a 422 is returned, with the errors keyed by the index
+        of each invalid resource. Otherwise the entities are created using
+        :func:`flump.orm.OrmIntegration.create_entities`, and returned in the
+        same order.
+
+        :param \**kwargs: Any kwargs taken from the url.
+        """
+        with self._time('load'):
+            incoming_data, errors = self._bulk_post_schema().load(
+                self.post_data
+            )
+        if errors:
+            raise FlumpUnprocessableEntity(errors=errors)
+
+        if any(resource.id is not None for resource in incoming_data):
+            raise Forbidden(
+                'You must not specify an id when creating an entity'
+            )
+
+        with self._time('write'):
+            new_models = resolve(self.orm_integration.create_entities(
+                [resource.attributes for resource in incoming_data]
+            ))
+        self._invalidate_total_count()
+        self._invalidate_entities()
+
+        entities = [self._build_entity_data(model) for model in new_models]
+        with self._time('dump'):
+            data = self.serializer.dump_many(
+                ResponseData(entities, {'self': request.url})
+            )
+        return self._make_json_response(data), 201
+
+    def _is_bulk_request(self):
+        """
+        :returns: Boolean indicating whether the request should be handled
+                  by :func:`Post.post_many`.
+        """
+        if not HttpMethods.BULK_POST <= self.HTTP_METHODS:
+            return False
+        post_data = self.post_data
+        return (isinstance(post_data, dict) and
+                isinstance(post_data.get('data'), list))
+
+    @property
+    def _bulk_post_schema(self):
+        """
+        A schema describing the format of bulk POST requests for jsonapi.
+        """
+        return make_bulk_entity_schema(self.SCHEMA, self.RESOURCE_NAME,
+                                       make_data_schema(self.SCHEMA))
+
     @property
     def _post_schema(self):
         """
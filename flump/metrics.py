@@ -0,0 +1,237 @@
+from bisect import bisect_left
+from threading import RLock, current_thread, local
+import weakref
+
+from .query import QUERY_SHAPE_CACHE
+from .schemas import SCHEMA_CACHE
+
+#: The upper bounds in seconds of the buckets of latency histograms.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+
+#: The mimetype of the Prometheus text exposition format.
+EXPOSITION_MIMETYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MetricsRegistry(object):
+    """
+    Counters and latency histograms describing the requests handled by the
+    views of a :class:`flump.FlumpBlueprint`, passed as its `metrics` kwarg.
+
+    Each thread records into its own shard, so recording never waits on a
+    lock. The shards are only merged when the metrics are read, which may
+    therefore miss values recorded concurrently. Once a thread has finished
+    its shard is merged into a shared base shard, so threads started for
+    each request do not grow the registry.
+
+    The recorded metrics, labelled by `view` and `method`, are:
+
+    - `flump_requests_total`, also labelled by response `status`, including
+      errors returned by the error handlers.
+    - `flump_request_duration_seconds`, a histogram of the request latency.
+    - `flump_entities_serialized_total`.
+    - `flump_response_bytes_total`, excluding streamed responses.
+
+    Hits and misses of the schema, query shape and count caches are read from
+    the caches when rendered.
+
+    :param buckets: The upper bounds of the histogram buckets.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._local = local()
+        self._base = ({}, {})
+        # The shard of each live thread, keyed by a weak reference to it.
+        self._shards = {}
+        # Re-entrant as shards are retired by weakref callbacks, which may
+        # run in any thread, including one already holding the lock.
+        self._shards_lock = RLock()
+
+    def inc(self, name, labels=(), amount=1):
+        """
+        Increments the counter `name` with the given `labels`, a tuple of
+        `(label, value)` pairs.
+        """
+        counters = self._get_shard()[0]
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        """
+        Records `value` in the histogram `name` with the given `labels`.
+        """
+        histograms = self._get_shard()[1]
+        key = (name, labels)
+        histogram = histograms.get(key)
+        if histogram is None:
+            # The count in each bucket, followed by the total count and sum.
+            histogram = histograms[key] = [0] * (len(self.buckets) + 3)
+        histogram[bisect_left(self.buckets, value)] += 1
+        histogram[-2] += 1
+        histogram[-1] += value
+
+    def counters(self):
+        """
+        :returns: A dict of the value of each counter, merged from every
+                  thread, keyed by `(name, labels)`.
+        """
+        merged = {}
+        for counters, _ in self._get_shards():
+            for key, value in list(counters.items()):
+                merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def histograms(self):
+        """
+        :returns: A dict of each histogram, merged from every thread, keyed
+                  by `(name, labels)`. Each histogram is a tuple of the
+                  cumulative count of each bucket, including a final `+Inf`
+                  bucket, the total count and the sum.
+        """
+        merged = {}
+        for _, histograms in self._get_shards():
+            for key, histogram in list(histograms.items()):
+                totals = merged.setdefault(key, [0] * len(histogram))
+                for i, value in enumerate(list(histogram)):
+                    totals[i] += value
+
+        result = {}
+        for key, histogram in merged.items():
+            cumulative, total = [], 0
+            for count in histogram[:-2]:
+                total += count
+                cumulative.append(total)
+            result[key] = (tuple(cumulative), histogram[-2], histogram[-1])
+        return result
+
+    def record_request(self, timings, response):
+        """
+        Records a request handled by a view, called by
+        :class:`.instrumentation.Instrumentation` as the request finishes.
+
+        :param timings:  The :class:`.instrumentation.RequestTimings` of the
+                         request.
+        :param response: The :class:`flask.Response`.
+        """
+        labels = (('view', timings.flump_view._view_name),
+                  ('method', timings.method))
+        self.inc('flump_requests_total',
+                 labels + (('status', str(response.status_code)), ))
+        self.observe('flump_request_duration_seconds', labels,
+                     timings.durations['total'])
+
+        entities = timings.counts.get('build')
+        if entities:
+            self.inc('flump_entities_serialized_total', labels, entities)
+        if not response.is_streamed and response.content_length:
+            self.inc('flump_response_bytes_total', labels,
+                     response.content_length)
+
+    def render(self, flump_views=()):
+        """
+        Renders the metrics in the Prometheus text exposition format.
+
+        :param flump_views: The :class:`.view.FlumpView` instances whose
+                            `COUNT_CACHE` hits and misses are included.
+        :returns: The text.
+        """
+        counters = self.counters()
+        for name, cache in (('schema', SCHEMA_CACHE),
+                            ('query_shape', QUERY_SHAPE_CACHE)):
+            labels = (('cache', name), )
+            counters[('flump_cache_hits_total', labels)] = cache.hits
+            counters[('flump_cache_misses_total', labels)] = cache.misses
+        for flump_view in flump_views:
+            count_cache = flump_view.COUNT_CACHE
+            if count_cache is not None:
+                labels = (('view', flump_view._view_name), )
+                counters[('flump_count_cache_hits_total', labels)] = (
+                    count_cache.hits
+                )
+                counters[('flump_count_cache_misses_total', labels)] = (
+                    count_cache.misses
+                )
+
+        lines = []
+        for name, samples in _group_by_name(counters):
+            lines.append('# TYPE {} counter'.format(name))
+            for labels, value in samples:
+                lines.append('{}{} {}'.format(name, _format_labels(labels),
+                                              _format_value(value)))
+
+        bounds = [_format_value(bound) for bound in self.buckets] + ['+Inf']
+        for name, samples in _group_by_name(self.histograms()):
+            lines.append('# TYPE {} histogram'.format(name))
+            for labels, (cumulative, count, total) in samples:
+                for bound, value in zip(bounds, cumulative):
+                    lines.append('{}_bucket{} {}'.format(
+                        name, _format_labels(labels + (('le', bound), )),
+                        value
+                    ))
+                lines.append('{}_count{} {}'.format(
+                    name, _format_labels(labels), count
+                ))
+                lines.append('{}_sum{} {}'.format(
+                    name, _format_labels(labels), _format_value(total)
+                ))
+        return '\n'.join(lines) + '\n'
+
+    def _get_shard(self):
+        """
+        :returns: The `(counters, histograms)` of the current thread.
+        """
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = ({}, {})
+            with self._shards_lock:
+                thread_ref = weakref.ref(current_thread(), self._retire_shard)
+                self._shards[thread_ref] = shard
+        return shard
+
+    def _retire_shard(self, thread_ref):
+        """
+        Merges the shard of a finished thread into the base shard.
+        """
+        with self._shards_lock:
+            shard = self._shards.pop(thread_ref, None)
+            if shard is None:
+                return
+            counters, histograms = self._base
+            for key, value in shard[0].items():
+                counters[key] = counters.get(key, 0) + value
+            for key, histogram in shard[1].items():
+                totals = histograms.setdefault(key, [0] * len(histogram))
+                for i, value in enumerate(histogram):
+                    totals[i] += value
+
+    def _get_shards(self):
+        with self._shards_lock:
+            return list(self._shards.values()) + [self._base]
+
+
+def _group_by_name(metrics):
+    """
+    :returns: A list of `(name, samples)` tuples sorted by name, where
+              `samples` is a sorted list of `(labels, value)` tuples.
+    """
+    grouped = {}
+    for (name, labels), value in metrics.items():
+        grouped.setdefault(name, []).append((labels, value))
+    return [(name, sorted(grouped[name])) for name in sorted(grouped)]
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{{{}}}'.format(','.join(
+        '{}="{}"'.format(label, _escape(value)) for label, value in labels
+    ))
+
+
+def _escape(value):
+    return (str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -1,8 +1,14 @@
+from .async_utils import gather
+
+
 class OrmIntegration(object):
     """
     Base OrmIntegration class. :data:`.view.FlumpView.ORM_INTEGRATION`
     should inherit from this class and implements the necessary methods for
     the :data:`.view.FlumpView.HTTP_METHODS`.
+
+    On Python 3 any of the methods may be implemented with `async def`, in
+    which case the returned coroutine is awaited by the view.
     """
     def delete_entity(self, entity):
         """
@@ -14,6 +20,18 @@ class OrmIntegration(object):
         """
         raise NotImplementedError
 
+    def delete_entities(self, entities):
+        """
+        Optional. Used when deleting many entities in a single request, for
+        instance to delete them all with a single query. Defaults to calling
+        :func:`OrmIntegration.delete_entity` for each entity.
+
+        :param entities: A list of the entities returned by
+                         :func:`.fetcher.Fetcher.get_entities` which are to
+                         be deleted.
+        """
+        gather(*[self.delete_entity(entity) for entity in entities])
+
     def create_entity(self, data):
         """
         Should save an entity from the given data.
@@ -23,6 +41,18 @@ class OrmIntegration(object):
         """
         raise NotImplementedError
 
+    def create_entities(self, data):
+        """
+        Optional. Used when creating many entities in a single request, for
+        instance to save them all with a single multi-row insert. Defaults to
+        calling :func:`OrmIntegration.create_entity` for each item.
+
+        :param data: A list of deserialized data dicts.
+        :returns: A list of the newly created entities, in the same order as
+                  `data`.
+        """
+        return gather(*[self.create_entity(item) for item in data])
+
     def update_entity(self, existing_entity, data):
         """
         Should update an entity from the given data.
@@ -33,3 +63,60 @@ class OrmIntegration(object):
         :returns: The updated entity.
         """
         raise NotImplementedError
+
+    def update_entities(self, updates):
+        """
+        Optional. Used when updating many entities in a single request, for
+        instance to save them all in a single transaction. Defaults to
+        calling :func:`OrmIntegration.update_entity` for each entity.
+
+        :param updates: A list of `(existing_entity, data)` tuples, where
+                        `existing_entity` was returned by
+                        :func:`.fetcher.Fetcher.get_entities` and `data` is
+                        the deserialized data dict for it.
+        :returns: A list of the updated entities, in the same order as
+                  `updates`.
+        """
+        return gather(*[self.update_entity(existing_entity, data)
+                        for existing_entity, data in updates])
+
+    def update_entity_if_match(self, entity_id, etags, data, **kwargs):
+        """
+        Optional. Should update the entity identified by `entity_id` and
+        `**kwargs` from the given data in a single atomic operation, for
+        instance an `UPDATE ... WHERE etag IN (...)`, only if its current etag
+        is in `etags`.
+
+        If this returns `NotImplemented` the entity is instead retrieved
+        using :func:`.fetcher.Fetcher.get_entity`, its etag is checked and it
+        is updated using :func:`OrmIntegration.update_entity`.
+
+        :param entity_id: The id of the entity to be updated.
+        :param etags: The :class:`werkzeug.datastructures.ETags` from the
+                      If-Match header, which may match any etag.
+        :param data: The deserialized data dict.
+        :param \**kwargs: Any other kwargs taken from the url which are used
+                          for identifying the entity to be updated.
+        :returns: The updated entity, or None if no entity was updated.
+        """
+        return NotImplemented
+
+    def delete_entity_if_match(self, entity_id, etags, **kwargs):
+        """
+        Optional. Should delete the entity identified by `entity_id` and
+        `**kwargs` in a single atomic operation, for instance a
+        `DELETE ... WHERE etag IN (...)`, only if its current etag is in
+        `etags`.
+
+        If this returns `NotImplemented` the entity is instead retrieved
+        using :func:`.fetcher.Fetcher.get_entity`, its etag is checked and it
+        is deleted using :func:`OrmIntegration.delete_entity`.
+
+        :param entity_id: The id of the entity to be deleted.
+        :param etags: The :class:`werkzeug.datastructures.ETags` from the
+                      If-Match header, which may match any etag.
+        :param \**kwargs: Any other kwargs taken from the url which are used
+                          for identifying the entity to be deleted.
+        :returns: Boolean indicating whether the entity was deleted.
+        """
+        return NotImplemented
@@ -1,8 +1,13 @@
 from collections import namedtuple
 from math import ceil
+from timeit import default_timer
 from werkzeug.exceptions import BadRequest
 
-from flask import request
+from flask import current_app, has_request_context, request
+from itsdangerous import BadSignature, URLSafeSerializer
+
+from .async_utils import gather, isawaitable, resolve
+from .web_utils import request_cache
 
 try:
     # handle imports for python 2/3
@@ -11,18 +16,164 @@ except ImportError:
     from urllib import urlencode
     from urlparse import urlparse
 
+try:
+    from contextvars import copy_context
+except ImportError:  # Python 2
+    copy_context = None
+
+
+#: Returned by a prefetched count which could not access the request.
+_UNAVAILABLE = object()
 
 PaginationArgs = namedtuple('PaginationArgs', ('page', 'size'))
 
+CursorPaginationArgs = namedtuple('CursorPaginationArgs',
+                                  ('after', 'before', 'size'))
+
+
+class TotalCount(object):
+    """
+    Defines the available policies for counting the total number of entities
+    for :data:`.view.FlumpView.TOTAL_COUNT`:
+
+    - `EXACT` always counts using
+      :func:`.fetcher.Fetcher.get_total_entities`.
+    - `ON_REQUEST` only counts if the client requested it by passing
+      `meta[total]=true` in the query string.
+    - `ESTIMATE` uses :func:`.fetcher.Fetcher.estimate_total_entities`.
+    - `NEVER` does not count the entities at all.
+    """
+    EXACT = 'exact'
+    ON_REQUEST = 'on_request'
+    ESTIMATE = 'estimate'
+    NEVER = 'never'
+
+
+class PaginationContext(object):
+    """
+    Holds the pagination state for a single get_many request, so that the
+    pagination args and total number of entities are computed at most once
+    per request, however many times they are used.
+
+    Should be retrieved using :func:`BasePagination.get_context`.
+
+    :param paginator: The :class:`BasePagination` for the current view.
+    :param kwargs:    The kwargs taken from the url for the current request.
+    """
+    def __init__(self, paginator, kwargs):
+        self.paginator = paginator
+        self.kwargs = kwargs
+        #: The time in seconds taken by each leg of the request, `count` for
+        #: counting the entities and `page` for fetching the page.
+        self.timings = {}
+        self._total_future = None
+
+    @property
+    def args(self):
+        """
+        The pagination args returned by
+        :func:`BasePagination.get_pagination_args`.
+        """
+        if not hasattr(self, '_args'):
+            self._args = self.paginator.get_pagination_args()
+        return self._args
+
+    @property
+    def total(self):
+        """
+        The total number of entities returned by
+        :func:`BasePagination.get_total_entities`.
+        """
+        if not hasattr(self, '_total'):
+            total = _UNAVAILABLE
+            if self._total_future is not None:
+                total = self._total_future.result()
+            self._total = self._count() if total is _UNAVAILABLE else total
+        return self._total
+
+    def prefetch_total(self, executor):
+        """
+        Starts counting the total number of entities on the given `executor`,
+        so that the count runs concurrently with fetching the page.
+
+        The count runs in a copy of the current context variables, so the
+        request is available without pushing its context again, which would
+        tear the request down when the count finishes. Where the request is
+        not held in a context variable, such as on Python 2, the entities
+        are instead counted when the total is first used.
+
+        :param executor: A :class:`concurrent.futures.Executor`.
+        """
+        if (hasattr(self, '_total') or self._total_future is not None or
+                self.paginator.total_count == TotalCount.NEVER or
+                copy_context is None):
+            return
+        self._total_future = executor.submit(copy_context().run,
+                                             self._count_in_worker)
+
+    def resolve_with_total(self, page):
+        """
+        Resolves the `page` returned by an `async def`
+        :func:`.fetcher.Fetcher.get_many_entities`. If the entities are also
+        counted by a coroutine, the count and page are awaited concurrently on
+        the same event loop.
+
+        :param page: The awaitable page of entities.
+        :returns: The page of entities.
+        """
+        if hasattr(self, '_total') or self._total_future is not None:
+            return resolve(page)
+
+        total = self.paginator.get_total_entities(**self.kwargs)
+        if not isawaitable(total):
+            self._total = total
+            return resolve(page)
+
+        start = default_timer()
+        page, self._total = gather(page, total)
+        self.timings['count'] = default_timer() - start
+        return page
+
+    def _count_in_worker(self):
+        if not has_request_context():
+            return _UNAVAILABLE
+        return self._count()
+
+    def _count(self):
+        start = default_timer()
+        try:
+            return resolve(self.paginator.get_total_entities(**self.kwargs))
+        finally:
+            self.timings['count'] = default_timer() - start
+
 
 class BasePagination(object):
     """
     Base Paginator class which all paginators should inherit from. Provides a
     `transform_get_many_response` function which is called from :func:`.methods.get_many.GetMany._make_get_many_response`
     in order to add any meta information as needed.
+
+    :param fetcher:     The :class:`.fetcher.Fetcher` for the view.
+    :param total_count: The :class:`TotalCount` policy for the view.
     """
-    def __init__(self, fetcher):
+    #: The maximum number of entities returned by a single get_many request,
+    #: including those filtered by id.
+    MAX_PAGE_SIZE = 100
+
+    def __init__(self, fetcher, total_count=TotalCount.EXACT):
         self.fetcher = fetcher
+        self.total_count = total_count
+
+    def get_context(self, **kwargs):
+        """
+        :param \**kwargs: The kwargs taken from the url.
+        :returns: The :class:`PaginationContext` for the current request.
+        """
+        cache = request_cache()
+        key = ('pagination', self)
+        if key not in cache:
+            cache[key] = PaginationContext(self, kwargs)
+        return cache[key]
 
     def get_pagination_args(self):
         """
@@ -30,6 +181,22 @@ class BasePagination(object):
         """
         return
 
+    def get_total_entities(self, **kwargs):
+        """
+        :returns: The total number of entities according to the
+                  :class:`TotalCount` policy, or None if the total is not
+                  known.
+        """
+        if self.total_count == TotalCount.NEVER:
+            return None
+        if self.total_count == TotalCount.ON_REQUEST:
+            if request.args.get('meta[total]') != 'true':
+                return None
+        elif self.total_count == TotalCount.ESTIMATE:
+            return self.fetcher.estimate_total_entities(**kwargs)
+
+        return self.fetcher.get_total_entities(**kwargs)
+
     def transform_get_many_response(self, response, **kwargs):
         """
         Transforms the response to a get_many request. Mainly intended to add
@@ -57,8 +224,8 @@ class PageSizePagination(BasePagination):
                   :attribute:`PageSizePagination.DEFAULT_PAGE_SIZE` and
                   :attribute:`PageSizePagination.MAX_PAGE_SIZE`.
         """
-        page = int(request.args.get('page[number]') or 1)
-        size = int(request.args.get('page[size]') or self.DEFAULT_PAGE_SIZE)
+        page = _get_int_arg('page[number]', 1)
+        size = _get_int_arg('page[size]', self.DEFAULT_PAGE_SIZE)
 
         if page < 1 or size < 1:
             raise BadRequest(
@@ -67,16 +234,22 @@ class PageSizePagination(BasePagination):
 
         return PaginationArgs(max(page, 1), min(size, self.MAX_PAGE_SIZE))
 
-    def get_pagination_links(self, **kwargs):
+    def get_pagination_links(self, entity_data=None, **kwargs):
         """
         Returns a dict containing all of the pagination links required by
         jsonapi.
 
+        If the total number of entities is not known the `last` link is None,
+        and the `next` link is provided if the current page is full.
+
+        :param entity_data: The list of :class:`.schemas.EntityData` on the
+                            current page.
         :param `**kwargs: kwargs used for constructing the pagination links.
         :returns: Dict containing the pagination links required by jsonapi.
         """
-        args = self.get_pagination_args()
-        total_entities = self.fetcher.get_total_entities(**kwargs)
+        context = self.get_context(**kwargs)
+        args = context.args
+        total_entities = context.total
         parsed_url = urlparse(request.url)
 
         other_query_params = [
@@ -85,21 +258,27 @@ class PageSizePagination(BasePagination):
         ]
 
         def make_url(page):
-            if not total_entities:
+            if total_entities == 0:
                 return None
             params = other_query_params + [
                 ('page[number]', page), ('page[size]', args.size)
             ]
             return parsed_url._replace(query=urlencode(params)).geturl()
 
-        num_pages = int(ceil(total_entities / float(args.size)))
+        if total_entities is None:
+            last = None
+            has_next = entity_data is None or len(entity_data) >= args.size
+        else:
+            num_pages = int(ceil(total_entities / float(args.size)))
+            last = make_url(num_pages)
+            has_next = args.page < num_pages
 
         return {
             'self': request.url,
             'first': make_url(1),
-            'last': make_url(num_pages),
+            'last': last,
             'prev': make_url(args.page - 1) if args.page > 1 else None,
-            'next': make_url(args.page + 1) if args.page < num_pages else None
+            'next': make_url(args.page + 1) if has_next else None
         }
 
     def transform_get_many_response(self, response, **kwargs):
@@ -109,9 +288,173 @@ class PageSizePagination(BasePagination):
 
         Also adds the `max_results` and `page` args to the meta.
         """
-        response = response._replace(links=self.get_pagination_links(**kwargs))
-        pagination_args = self.get_pagination_args()
+        response = response._replace(
+            links=self.get_pagination_links(entity_data=response.data,
+                                            **kwargs)
+        )
+        pagination_args = self.get_context(**kwargs).args
         meta = response.meta
         meta['extra'] = {'size': pagination_args.size,
                          'page': pagination_args.page}
         return response._replace(meta=meta)
+
+
+class CursorPagination(BasePagination):
+    """
+    Mixin class which provides methods for cursor (keyset) based pagination,
+    using the `page[after]`, `page[before]` and `page[size]` query params.
+
+    Cursors are opaque to clients, and signed using the application's
+    `SECRET_KEY`, which must be set, so they cannot be tampered with.
+    Fetchers receive the decoded cursors in :class:`CursorPaginationArgs`,
+    and should return up to `size` entities immediately after `after` (or
+    immediately before `before`), in the usual order. This allows queries
+    such as `WHERE id > :after ORDER BY id LIMIT :size`, whose cost does not
+    grow with the depth of the page.
+
+    As links are built from the entities on the current page, the total number
+    of entities is never required.
+    """
+    DEFAULT_PAGE_SIZE = 10
+    MAX_PAGE_SIZE = 100
+    SALT = 'flump.pagination.cursor'
+
+    def get_cursor(self, entity):
+        """
+        :param entity: An entity returned by
+                       :func:`.fetcher.Fetcher.get_many_entities`.
+        :returns: A JSON serializable value identifying the position of the
+                  `entity` in the collection. Defaults to the entity id.
+        """
+        return entity.id
+
+    def encode_cursor(self, value):
+        """
+        :returns: An opaque, signed string representing the cursor `value`.
+        """
+        return self._cursor_serializer.dumps(value)
+
+    def decode_cursor(self, cursor):
+        """
+        :returns: The cursor value represented by the string `cursor`.
+        :raises werkzeug.exceptions.BadRequest: If the cursor is invalid.
+        """
+        try:
+            return self._cursor_serializer.loads(cursor)
+        except BadSignature:
+            raise BadRequest("Invalid pagination cursor")
+
+    @property
+    def _cursor_serializer(self):
+        if not current_app.secret_key:
+            raise RuntimeError(
+                'CursorPagination requires the SECRET_KEY config value to be '
+                'set, as it is used to sign the cursors.'
+            )
+        return URLSafeSerializer(current_app.secret_key, salt=self.SALT)
+
+    def get_pagination_args(self):
+        """
+        Gets the pagination args from the query string.
+
+        :returns: :class:`CursorPaginationArgs` containing the decoded cursors
+                  and page size specified. Accounts for
+                  :attribute:`CursorPagination.DEFAULT_PAGE_SIZE` and
+                  :attribute:`CursorPagination.MAX_PAGE_SIZE`.
+        """
+        after = request.args.get('page[after]')
+        before = request.args.get('page[before]')
+        size = _get_int_arg('page[size]', self.DEFAULT_PAGE_SIZE)
+
+        if after and before:
+            raise BadRequest(
+                "Only one of page[after] and page[before] may be specified"
+            )
+        if size < 1:
+            raise BadRequest("page[size] must be at least 1")
+
+        return CursorPaginationArgs(
+            self.decode_cursor(after) if after else None,
+            self.decode_cursor(before) if before else None,
+            min(size, self.MAX_PAGE_SIZE)
+        )
+
+    def get_total_entities(self, **kwargs):
+        """
+        Cursor pagination never counts the entities.
+
+        :returns: None
+        """
+        return None
+
+    def get_pagination_links(self, entity_data, **kwargs):
+        """
+        Returns a dict containing the pagination links required by jsonapi.
+        The `last` link is omitted, as it is not known without counting the
+        entities.
+
+        :param entity_data: The list of :class:`.schemas.EntityData` on the
+                            current page.
+        :param \**kwargs: kwargs used for constructing the pagination links.
+        :returns: Dict containing the pagination links required by jsonapi.
+        """
+        args = self.get_context(**kwargs).args
+        parsed_url = urlparse(request.url)
+
+        other_query_params = [
+            (k, v) for (k, v) in request.args.items()
+            if k not in ('page[after]', 'page[before]', 'page[size]')
+        ]
+
+        def make_url(param=None, entity=None):
+            params = list(other_query_params)
+            if param:
+                cursor = self.get_cursor(entity.attributes)
+                params.append((param, self.encode_cursor(cursor)))
+            params.append(('page[size]', args.size))
+            return parsed_url._replace(query=urlencode(params)).geturl()
+
+        full_page = len(entity_data) >= args.size
+        has_next = entity_data and (args.before is not None or full_page)
+        has_prev = entity_data and (
+            args.after is not None or (args.before is not None and full_page)
+        )
+
+        return {
+            'self': request.url,
+            'first': make_url(),
+            'prev': (make_url('page[before]', entity_data[0])
+                     if has_prev else None),
+            'next': (make_url('page[after]', entity_data[-1])
+                     if has_next else None)
+        }
+
+    def transform_get_many_response(self, response, **kwargs):
+        """
+        Returns a `schemas.ManyResponseData` with the links replaced with
+        those returned by `get_pagination_links`.
+
+        Also adds the page `size` to the meta.
+        """
+        response = response._replace(
+            links=self.get_pagination_links(entity_data=response.data,
+                                            **kwargs)
+        )
+        meta = response.meta
+        meta['extra'] = {'size': self.get_context(**kwargs).args.size}
+        return response._replace(meta=meta)
+
+
+def _get_int_arg(name, default):
+    """
+    :returns: The integer value of the query param `name`, or `default` if
+              it is not given.
+    :raises werkzeug.exceptions.BadRequest: If the value is not an integer.
+    """
+    value = request.args.get(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise BadRequest("{} must be an integer".format(name))
@@ -0,0 +1,158 @@
+from collections import namedtuple
+import re
+
+from marshmallow import ValidationError
+from werkzeug.exceptions import BadRequest
+
+from .cache import LRUCache
+
+
+#: The operators which may be used in `filter[<field>][<operator>]` params.
+#: `filter[<field>]` is equivalent to `filter[<field>][eq]`, and the value of
+#: an `in` filter is a comma separated list.
+FILTER_OPERATORS = frozenset(['eq', 'ne', 'lt', 'lte', 'gt', 'gte', 'in'])
+
+#: Cache of the parsers built for each distinct shape of query, that is the
+#: filter params and sort given, ignoring the filter values.
+QUERY_SHAPE_CACHE = LRUCache(maxsize=512)
+
+_FILTER_PARAM = re.compile(r'^filter\[([^\]]+)\](?:\[([^\]]+)\])?$')
+
+#: A single condition of a :class:`QuerySpec`.
+Filter = namedtuple('Filter', ('attribute', 'op', 'value'))
+
+#: A single sort key of a :class:`QuerySpec`.
+Sort = namedtuple('Sort', ('attribute', 'descending'))
+
+
+class QuerySpec(namedtuple('QuerySpec', ('filters', 'sort'))):
+    """
+    The validated filters and sort requested for a get_many request, as
+    provided to fetchers by :attr:`.fetcher.Fetcher.query_spec`.
+
+    :param filters: A tuple of :class:`Filter`, which should all be
+                    satisfied by the returned entities. Values have been
+                    deserialized by the corresponding field of the view's
+                    `SCHEMA`, and the value of an `in` filter is a tuple.
+    :param sort:    A tuple of :class:`Sort` to order the entities by, most
+                    significant first.
+
+    Attributes are the names of the entity attributes, taking the
+    `attribute` of the schema fields into account.
+    """
+    __slots__ = ()
+
+    @property
+    def shape(self):
+        """
+        The spec without the filter values. Fetchers which translate the spec
+        into a query may use this as the key for caching the compiled query,
+        binding the `values` as parameters.
+        """
+        return (tuple(f.attribute for f in self.filters),
+                tuple(f.op for f in self.filters),
+                self.sort)
+
+    @property
+    def values(self):
+        """
+        A tuple of the filter values, in the same order as the `filters`.
+        """
+        return tuple(f.value for f in self.filters)
+
+
+def parse_query_spec(schema, filterable_fields, sortable_fields, args):
+    """
+    Parses the `filter[...]` and `sort` query params into a
+    :class:`QuerySpec`.
+
+    The `filter[id]` param is not parsed, as it is either handled by
+    :func:`.methods.get_many.GetMany.get_many` or left to the fetcher. Filter
+    params are ignored if `filterable_fields` is empty, as is the sort param
+    if `sortable_fields` is empty.
+
+    :param schema:            The resource :class:`marshmallow.Schema`.
+    :param filterable_fields: The names of the schema fields which may be
+                              filtered on.
+    :param sortable_fields:   The names of the schema fields which may be
+                              sorted by.
+    :param args:              The query params.
+    :returns: A :class:`QuerySpec`.
+    :raises BadRequest: If a field may not be filtered or sorted by, or a
+                        filter is invalid.
+    """
+    filterable_fields = frozenset(filterable_fields)
+    sortable_fields = frozenset(sortable_fields)
+
+    filter_params = ()
+    if filterable_fields:
+        filter_params = tuple(sorted(
+            param for param in args
+            if param.startswith('filter[') and param != 'filter[id]'
+        ))
+    sort = args.get('sort', '') if sortable_fields else ''
+
+    key = (schema, filterable_fields, sortable_fields, filter_params, sort)
+    filter_parsers, sort_spec = QUERY_SHAPE_CACHE.get_or_create(
+        key, lambda: _compile_query_shape(schema, filterable_fields,
+                                          sortable_fields, filter_params,
+                                          sort)
+    )
+
+    filters = tuple(
+        Filter(attribute, op,
+               _load_filter_value(param, field, op, args[param]))
+        for param, attribute, op, field in filter_parsers
+    )
+    return QuerySpec(filters, sort_spec)
+
+
+def _compile_query_shape(schema, filterable_fields, sortable_fields,
+                         filter_params, sort):
+    """
+    Validates the shape of a query.
+
+    :returns: A tuple of a list of `(param, attribute, op, field)` tuples for
+              loading each filter, and the tuple of :class:`Sort`.
+    """
+    declared_fields = schema._declared_fields
+
+    filter_parsers = []
+    for param in filter_params:
+        match = _FILTER_PARAM.match(param)
+        if not match:
+            raise BadRequest('Invalid filter "{}".'.format(param))
+        name, op = match.group(1), match.group(2) or 'eq'
+        if name not in filterable_fields or name not in declared_fields:
+            raise BadRequest('Can not filter on "{}".'.format(name))
+        if op not in FILTER_OPERATORS:
+            raise BadRequest('Unknown filter operator "{}".'.format(op))
+        field = declared_fields[name]
+        filter_parsers.append((param, field.attribute or name, op, field))
+
+    sort_spec = []
+    for name in sort.split(','):
+        if not name:
+            continue
+        descending = name.startswith('-')
+        name = name.lstrip('-')
+        if name not in sortable_fields or name not in declared_fields:
+            raise BadRequest('Can not sort by "{}".'.format(name))
+        attribute = declared_fields[name].attribute or name
+        sort_spec.append(Sort(attribute, descending))
+
+    return filter_parsers, tuple(sort_spec)
+
+
+def _load_filter_value(param, field, op, value):
+    """
+    Deserializes the value of a filter using the schema `field`.
+    """
+    values = value.split(',') if op == 'in' else [value]
+    try:
+        values = tuple(field.deserialize(v) for v in values)
+    except ValidationError as e:
+        raise BadRequest('Invalid value for "{}": {}'.format(
+            param, ' '.join(e.messages)
+        ))
+    return values if op == 'in' else values[0]
@@ -0,0 +1,175 @@
+import hashlib
+
+from marshmallow import utils
+
+from .async_utils import resolve
+
+
+class Relationship(object):
+    """
+    Declares a relationship from the entities of a :class:`.view.FlumpView`
+    to the entities of another view, so that the related entities may be
+    included in a compound document using the `include` query param. See
+    :data:`.view.FlumpView.RELATIONSHIPS`.
+
+    :param view:      The :class:`.view.FlumpView` class of the related
+                      entities. These are retrieved using the
+                      :func:`.fetcher.Fetcher.get_entities` of its `FETCHER`.
+    :param attribute: The attribute on each entity holding the id of the
+                      related entity, or a list of ids if `many`.
+    :param many:      Whether each entity is related to many entities.
+    """
+    def __init__(self, view, attribute, many=False):
+        self.view = view
+        self.attribute = attribute
+        self.many = many
+
+    def get_ids(self, entity):
+        """
+        :returns: A list of the ids of the entities related to `entity`.
+        """
+        value = utils.get_value(self.attribute, entity)
+        if value is utils.missing or value is None:
+            return []
+        if self.many:
+            return [entity_id for entity_id in value if entity_id is not None]
+        return [value]
+
+
+class IncludedResources(object):
+    """
+    Collects the entities related to the primary entities of a response, and
+    retrieves each relationship with a single batched call to the related
+    view's fetcher.
+
+    :param view:  The :class:`.view.FlumpView` handling the request.
+    :param names: The names of the relationships to include.
+    """
+    def __init__(self, view, names):
+        self.view = view
+        self.names = names
+        self._primary = set()
+        self._related_ids = {name: [] for name in names}
+        self._seen_ids = {name: set() for name in names}
+        self._included = None
+
+    def __bool__(self):
+        return bool(self.names)
+
+    __nonzero__ = __bool__
+
+    def add(self, entity):
+        """
+        Records the ids of the entities related to the primary `entity`.
+        """
+        self._primary.add((self.view.RESOURCE_NAME, str(entity.id)))
+        for name in self.names:
+            relationship = self.view.RELATIONSHIPS[name]
+            seen = self._seen_ids[name]
+            for entity_id in relationship.get_ids(entity):
+                if str(entity_id) not in seen:
+                    seen.add(str(entity_id))
+                    self._related_ids[name].append(entity_id)
+
+    def link(self, entity, resource):
+        """
+        Adds the `relationships` member to the dumped `resource` for the
+        primary `entity`.
+        """
+        if not self.names:
+            return
+
+        relationships = resource['relationships'] = {}
+        for name in self.names:
+            relationship = self.view.RELATIONSHIPS[name]
+            resource_name = self.view._get_related_view(name).RESOURCE_NAME
+            linkage = [{'type': resource_name, 'id': str(entity_id)}
+                       for entity_id in relationship.get_ids(entity)]
+            if not relationship.many:
+                linkage = linkage[0] if linkage else None
+            relationships[name] = {'data': linkage}
+
+    def update_document(self, document, entities):
+        """
+        Links the dumped primary resources in `document` to their related
+        entities, and adds the `included` member. Does nothing if no
+        relationships were requested.
+
+        :param document: The dumped response.
+        :param entities: The primary entities, in the same order as the
+                         resources in `document`.
+        """
+        if not self.names:
+            return
+
+        resources = document['data']
+        if not isinstance(resources, list):
+            resources = [resources]
+        for entity, resource in zip(entities, resources):
+            self.link(entity, resource)
+        document['included'] = self.dump()
+
+    def fetch(self):
+        """
+        Retrieves the related entities, once all of the primary entities have
+        been added.
+
+        :returns: A list of `(view, entity_data)` tuples for each included
+                  entity, without duplicates or primary entities.
+        """
+        if self._included is not None:
+            return self._included
+
+        self._included = []
+        keys = set(self._primary)
+        for name in self.names:
+            entity_ids = self._related_ids[name]
+            if not entity_ids:
+                continue
+
+            related_view = self.view._get_related_view(name)
+            related_view._set_requested_fields()
+            entities = resolve(related_view.fetcher.get_entities(entity_ids))
+            for entity in entities:
+                if not entity:
+                    continue
+                key = (related_view.RESOURCE_NAME, str(entity.id))
+                if key not in keys:
+                    keys.add(key)
+                    self._included.append(
+                        (related_view, related_view._build_entity_data(entity))
+                    )
+        return self._included
+
+    def etags(self):
+        """
+        :returns: A list of the etags of the included entities.
+        """
+        return [entity_data.meta.etag for _, entity_data in self.fetch()]
+
+    def make_etag(self, etag):
+        """
+        :param etag: The etag string of the primary entity.
+        :returns: The etag for a compound document, derived from `etag` and
+                  the etags of the included entities, or `etag` itself if no
+                  relationships were requested.
+        """
+        if not self.names:
+            return etag
+        key = repr((etag, tuple(self.names), self.etags()))
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def dump(self):
+        """
+        :returns: A list of the dumped included entities, for the `included`
+                  member of the response.
+        """
+        dumpers = {}
+        included = []
+        for related_view, entity_data in self.fetch():
+            if related_view not in dumpers:
+                dumpers[related_view] = (
+                    related_view.serializer.make_entity_dumper()
+                )
+            included.append(dumpers[related_view](entity_data))
+        return included
@@ -1,8 +1,10 @@
 from collections import namedtuple
 
-from marshmallow import Schema, fields, post_load, pre_dump
+from marshmallow import (Schema, ValidationError, fields, post_load,
+                         pre_dump)
 from werkzeug.exceptions import Conflict
 
+from .cache import LRUCache
 from .exceptions import FlumpUnprocessableEntity
 
 
@@ -15,10 +17,58 @@ EntityMetaData = namedtuple('EntityMetaData', ('etag'))
 ManyResponseData = namedtuple('ManyResponseData', ('data', 'links', 'meta'))
 
 
+#: Cache of the generated Schema classes. Building a Schema class is
+#: expensive, so we build each variant once and reuse it on later requests.
+SCHEMA_CACHE = LRUCache(maxsize=512)
+
+
 class EntityMetaSchema(Schema):
     etag = fields.Str(dump_only=True)
 
 
+class ResourceIdentifierSchema(Schema):
+    """
+    Describes a jsonapi resource identifier, as sent when deleting many
+    entities.
+    """
+    id = fields.Str(required=True)
+    type = fields.Str(required=True)
+
+    @post_load
+    def to_entity_data(self, data):
+        return EntityData(data['id'], data['type'], None, None)
+
+
+class _AttributesNested(fields.Nested):
+    """
+    A Nested field which loads the nested schema with `partial`, which is
+    otherwise ignored by marshmallow 2.
+    """
+    def __init__(self, nested, partial=False, **kwargs):
+        super(_AttributesNested, self).__init__(nested, **kwargs)
+        self.partial = partial
+
+    def _deserialize(self, value, attr, data):
+        if not self.partial:
+            return super(_AttributesNested, self)._deserialize(value, attr,
+                                                               data)
+
+        data, errors = self.schema.load(value, partial=self.partial)
+        if errors:
+            raise ValidationError(errors, data=data)
+        return data
+
+
+def _freeze(value):
+    """
+    Converts an `only` or `partial` argument into a hashable value, so that
+    it may be used as part of a :data:`SCHEMA_CACHE` key.
+    """
+    if value is None or isinstance(value, bool):
+        return value
+    return frozenset(value)
+
+
 def make_data_schema(
     resource_schema, only=None, partial=False, id_required=False
 ):
@@ -37,12 +87,20 @@ def make_data_schema(
                             `JsonApiSchema`
     :returns:               :class:`make_data_schema.JsonApiSchema`
     """
+    only, partial = _freeze(only), _freeze(partial)
+    key = ('data', resource_schema, only, partial, id_required)
+    return SCHEMA_CACHE.get_or_create(
+        key, lambda: _make_data_schema(resource_schema, only, partial,
+                                       id_required)
+    )
+
 
+def _make_data_schema(resource_schema, only, partial, id_required):
     class JsonApiSchema(Schema):
         id = fields.Str(required=id_required)
         type = fields.Str(required=True)
-        attributes = fields.Nested(resource_schema,
-                                   required=True, only=only, partial=partial)
+        attributes = _AttributesNested(resource_schema, required=True,
+                                       only=only, partial=partial)
         meta = fields.Nested(EntityMetaSchema, dump_only=True)
 
         @post_load
@@ -71,6 +129,14 @@ def make_response_schema(resource_schema, only=None, many=False):
                             entities.
     :returns:               :class:`make_response_schema.JsonApiResponseSchema`
     """
+    only = _freeze(only)
+    key = ('response', resource_schema, only, many)
+    return SCHEMA_CACHE.get_or_create(
+        key, lambda: _make_response_schema(resource_schema, only, many)
+    )
+
+
+def _make_response_schema(resource_schema, only, many):
     data_schema = make_data_schema(resource_schema, only=only)
 
     class LinkSchema(Schema):
@@ -107,7 +173,13 @@ def make_entity_schema(resource_schema, resource_name, data_schema):
                             :class:`make_data_schema.JsonApiSchema`.
     :returns:               :class:`make_entity_schema.JsonApiPostSchema`
     """
+    key = ('entity', resource_schema, resource_name, data_schema)
+    return SCHEMA_CACHE.get_or_create(
+        key, lambda: _make_entity_schema(resource_name, data_schema)
+    )
+
 
+def _make_entity_schema(resource_name, data_schema):
     class JsonApiPostSchema(Schema):
         data = fields.Nested(data_schema)
 
@@ -121,13 +193,58 @@ def make_entity_schema(resource_schema, resource_name, data_schema):
             if not resource:
                 raise FlumpUnprocessableEntity
 
-            if resource.type != resource_name:
-                err_msg = (
-                    'Url specified the creation of "{}" but type '
-                    'specified "{}".'
-                ).format(resource_name, resource.type)
-                raise Conflict(err_msg)
-
+            _check_resource_type(resource, resource_name)
             return resource
 
     return JsonApiPostSchema
+
+
+def make_bulk_entity_schema(resource_schema, resource_name, data_schema):
+    """
+    Constructs a schema describing the format of bulk requests for jsonapi,
+    where `data` is an array of resources. Validation errors are keyed by the
+    index of the resource in the array.
+
+    :param resource_schema: The schema describing the resource. Should be
+                            an instance of :class:`marshmallow.Schema`
+    :param resource_name:   The name of the resource type defined for the API.
+    :param data_schema:     An instance or
+                            :class:`make_data_schema.JsonApiSchema`.
+    :returns:               :class:`make_bulk_entity_schema.JsonApiBulkSchema`
+    """
+    key = ('bulk_entity', resource_schema, resource_name, data_schema)
+    return SCHEMA_CACHE.get_or_create(
+        key, lambda: _make_bulk_entity_schema(resource_name, data_schema)
+    )
+
+
+def _make_bulk_entity_schema(resource_name, data_schema):
+    class JsonApiBulkSchema(Schema):
+        data = fields.Nested(data_schema, many=True, required=True)
+
+        @post_load
+        def check_for_errors(self, loaded_data):
+            """
+            Checks the respource type of every resource, raising the errors
+            specified in jsonapi if they do not match.
+            """
+            resources = loaded_data['data']
+            for resource in resources:
+                _check_resource_type(resource, resource_name)
+
+            return resources
+
+    return JsonApiBulkSchema
+
+
+def _check_resource_type(resource, resource_name):
+    """
+    Raises a Conflict if the type of the loaded `resource` does not match
+    `resource_name`.
+    """
+    if resource.type != resource_name:
+        err_msg = (
+            'Url specified the creation of "{}" but type '
+            'specified "{}".'
+        ).format(resource_name, resource.type)
+        raise Conflict(err_msg)
@@ -0,0 +1,268 @@
+from marshmallow import fields, Schema, utils
+from marshmallow.compat import text_type
+
+from .cache import LRUCache
+
+
+class MarshmallowSerializer(object):
+    """
+    The default serializer. Dumps responses using the Schemas provided by
+    :data:`.view.FlumpView.response_schema` and
+    :data:`.methods.get_many.GetMany._many_response_schema`.
+
+    :param view: The :class:`.view.FlumpView` responses are dumped for.
+    """
+    def __init__(self, view):
+        self.view = view
+
+    def dump(self, response_data):
+        """
+        Dumps a response for a single entity.
+
+        :param response_data: :class:`.schemas.ResponseData` to dump.
+        :returns: The dumped response as a dict.
+        """
+        data, _ = self.view.response_schema(strict=True).dump(response_data)
+        return data
+
+    def dump_many(self, response_data):
+        """
+        Dumps a response for many entities.
+
+        :param response_data: :class:`.schemas.ManyResponseData` to dump.
+        :returns: The dumped response as a dict.
+        """
+        data, _ = self.view._many_response_schema(strict=True).dump(
+            response_data
+        )
+        return data
+
+    def make_entity_dumper(self):
+        """
+        :returns: A function which dumps a single :class:`.schemas.EntityData`
+                  to a dict. This should only be used for the duration of the
+                  current request.
+        """
+        schema = self.view.data_schema(strict=True)
+        return lambda entity_data: schema.dump(entity_data).data
+
+
+class CompiledSerializer(MarshmallowSerializer):
+    """
+    A serializer which inspects the view's `SCHEMA` once per sparse fieldset
+    and builds a specialised function for dumping entities, rather than
+    walking the nested marshmallow Schemas for every entity.
+
+    Simple fields (strings, integers, floats and booleans) are read and
+    formatted directly, while any other field is serialized by marshmallow,
+    so the output is identical to that of :class:`MarshmallowSerializer`.
+    Schemas which use dump processors or a custom `get_attribute` are dumped
+    entirely by marshmallow.
+
+    As the jsonapi envelope is built directly, this should not be used by
+    views which override `response_schema`.
+    """
+    def __init__(self, view):
+        super(CompiledSerializer, self).__init__(view)
+        self._compiled = LRUCache(maxsize=64)
+
+    def dump(self, response_data):
+        dump_entity = self.make_entity_dumper()
+        return _dump_document(response_data, dump_entity(response_data.data))
+
+    def dump_many(self, response_data):
+        dump_entity = self.make_entity_dumper()
+        entities = response_data.data
+        if entities is not None:
+            entities = [dump_entity(entity) for entity in entities]
+        return _dump_document(response_data, entities)
+
+    def make_entity_dumper(self):
+        only = self.view._get_sparse_fieldset()
+        if only is not None:
+            only = frozenset(only)
+        compiled = self._compiled.get_or_create(
+            only, lambda: CompiledSchema(self.view.SCHEMA, only)
+        )
+        return _make_entity_dumper(compiled.make_dumper())
+
+
+class CompiledSchema(object):
+    """
+    The result of inspecting a resource Schema for a given `only`.
+
+    :param schema_class: The resource :class:`marshmallow.Schema`.
+    :param only:         The fields to dump, or None for all fields.
+    """
+    def __init__(self, schema_class, only=None):
+        self.schema_class = schema_class
+        self.only = only
+        self.use_marshmallow = not _can_compile(schema_class, only)
+
+        self.simple_fields = []
+        self.other_fields = []
+        if self.use_marshmallow:
+            return
+
+        for name, field in schema_class(only=only).fields.items():
+            if field.load_only:
+                continue
+            key = field.dump_to or name
+            attribute = field.attribute or name
+            formatter = _FORMATTERS.get(type(field))
+            if formatter is None or '.' in attribute or (
+                    isinstance(field, fields.Number) and field.as_string):
+                self.other_fields.append((key, name))
+            else:
+                self.simple_fields.append(
+                    (key, name, attribute, formatter, field)
+                )
+
+    def make_dumper(self):
+        """
+        :returns: A function which dumps an entity to a dict. This should only
+                  be used for the duration of a single response, as the
+                  marshmallow fields it uses are not thread safe.
+        """
+        if self.use_marshmallow:
+            schema = self.schema_class(only=self.only, strict=True)
+            return lambda entity: schema.dump(entity).data
+
+        simple_fields = self.simple_fields
+        other_fields = []
+        if self.other_fields:
+            schema_fields = self.schema_class(only=self.only).fields
+            other_fields = [(key, name, schema_fields[name])
+                            for key, name in self.other_fields]
+
+        def dump(entity):
+            if hasattr(entity, '__getitem__'):
+                get_value = utils.get_value
+            else:
+                get_value = _get_attribute
+
+            rv = {}
+            for key, name, attribute, formatter, field in simple_fields:
+                value = get_value(attribute, entity)
+                if value is utils.missing:
+                    # Let marshmallow deal with any default for the field.
+                    value = field.serialize(name, entity)
+                    if value is utils.missing:
+                        continue
+                else:
+                    value = formatter(value, field, name, entity)
+                rv[key] = value
+
+            for key, name, field in other_fields:
+                value = field.serialize(name, entity)
+                if value is not utils.missing:
+                    rv[key] = value
+            return rv
+
+        return dump
+
+
+def _can_compile(schema_class, only):
+    """
+    :returns: Whether `schema_class` can be dumped by a compiled function for
+              the given `only`.
+    """
+    if schema_class._has_processors or schema_class.__accessor__:
+        return False
+    get_attribute = getattr(schema_class.get_attribute, '__func__',
+                            schema_class.get_attribute)
+    if get_attribute is not getattr(Schema.get_attribute, '__func__',
+                                    Schema.get_attribute):
+        return False
+    opts = schema_class.opts
+    if opts.fields or opts.additional:
+        return False
+    # Unknown names in `only` cause marshmallow to infer fields from the
+    # entity being dumped.
+    return only is None or only <= set(schema_class._declared_fields)
+
+
+def _get_attribute(attribute, entity):
+    """
+    Equivalent of :func:`marshmallow.utils.get_value` for entities which do
+    not support item access.
+    """
+    value = getattr(entity, attribute, utils.missing)
+    return value() if callable(value) else value
+
+
+def _format_exact(python_type):
+    """
+    Builds a formatter which passes through values that are already of
+    `python_type`, and leaves formatting of any other value to the field.
+    """
+    def formatter(value, field, name, entity):
+        if value is None or type(value) is python_type:
+            return value
+        return field._serialize(value, name, entity)
+    return formatter
+
+
+_FORMATTERS = {
+    fields.String: _format_exact(text_type),
+    fields.Integer: _format_exact(int),
+    fields.Float: _format_exact(float),
+    fields.Boolean: _format_exact(bool),
+}
+
+
+def _text(value):
+    if value is None:
+        return None
+    return utils.ensure_text_type(value)
+
+
+def _make_entity_dumper(dump_attributes):
+    """
+    Builds a function which dumps an :class:`.schemas.EntityData` in the
+    format of :class:`.schemas.make_data_schema.JsonApiSchema`.
+    """
+    def dump_entity(entity_data):
+        if entity_data is None:
+            return None
+        attributes, meta = entity_data.attributes, entity_data.meta
+        return {
+            'id': _text(entity_data.id),
+            'type': _text(entity_data.type),
+            'attributes': (None if attributes is None
+                           else dump_attributes(attributes)),
+            'meta': None if meta is None else {'etag': _text(meta.etag)}
+        }
+    return dump_entity
+
+
+_LINK_KEYS = ('self', 'first', 'last', 'next', 'prev')
+
+
+def _dump_document(response_data, data):
+    """
+    Dumps the top level of a response in the format of
+    :class:`.schemas.make_response_schema.JsonApiResponseSchema`.
+    """
+    rv = {'data': data}
+
+    links = response_data.links
+    if links is None:
+        rv['links'] = None
+    else:
+        rv['links'] = {key: _text(links[key])
+                       for key in _LINK_KEYS if key in links}
+
+    meta = getattr(response_data, 'meta', utils.missing)
+    if meta is None:
+        rv['meta'] = None
+    elif meta is not utils.missing:
+        rv['meta'] = dumped_meta = {}
+        if 'total_count' in meta:
+            total_count = meta['total_count']
+            dumped_meta['total_count'] = (
+                None if total_count is None else int(total_count)
+            )
+        if 'extra' in meta:
+            dumped_meta['extra'] = meta['extra']
+    return rv
@@ -1,14 +1,24 @@
 from flask import request, make_response
 from flask.views import MethodView
-from werkzeug.exceptions import PreconditionFailed, PreconditionRequired
+from werkzeug.exceptions import (BadRequest, NotFound, PreconditionFailed,
+                                 PreconditionRequired)
 
+from .async_utils import resolve
+from .cache import CountCachingFetcher
 from .methods import Delete, GetMany, GetSingle, HttpMethods, Patch, Post
 from .orm import OrmIntegration
-from .pagination import BasePagination
-from .fetcher import Fetcher
-from .schemas import (EntityData, EntityMetaData, make_data_schema,
+from .pagination import BasePagination, TotalCount
+from .query import parse_query_spec
+from .relationships import IncludedResources
+from .fetcher import Fetcher, MemoizingFetcherMixin
+from .instrumentation import (NULL_TIMER, get_request_timings,
+                              start_request_timings)
+from .serializers import MarshmallowSerializer
+from .schemas import (EntityData, EntityMetaData, make_bulk_entity_schema,
+                      make_data_schema, make_entity_schema,
                       make_response_schema)
-from .web_utils import MIMETYPE
+from .web_utils import (DEFAULT_JSON_BACKEND, MIMETYPE, make_json_response,
+                        request_cache)
 
 
 class FlumpView(Patch, Delete, GetMany, GetSingle, Post):
@@ -38,6 +48,59 @@ class FlumpView(Patch, Delete, GetMany, GetSingle, Post):
         A paginator to use, the default provides NO pagination. If overridden
         must inherit from :class:`.paginator.BasePagination`
 
+    .. data:: TOTAL_COUNT
+
+        The :class:`.pagination.TotalCount` policy used when counting the
+        total number of entities for `meta.total_count` and pagination links.
+        The default always counts the entities.
+
+    .. data:: COUNT_CACHE
+
+        A :class:`.cache.CountCache` used to cache the total number of
+        entities. The default of None does not cache totals.
+
+    .. data:: STREAM_GET_MANY
+
+        If True, get_many responses are streamed to the client as each entity
+        is fetched and dumped, keeping memory use constant regardless of the
+        page size.
+
+    .. data:: SERIALIZER
+
+        The serializer used to dump responses, the default uses the Schemas
+        from :data:`.FlumpView.response_schema`.
+        :class:`.serializers.CompiledSerializer` may be used instead for
+        faster dumping of responses.
+
+    .. data:: RELATIONSHIPS
+
+        A dict mapping relationship names to
+        :class:`.relationships.Relationship` declarations. Related entities
+        are included in compound documents when their relationship names are
+        given in the `include` query param of GET requests. The default
+        declares no relationships.
+
+    .. data:: FILTERABLE_FIELDS
+
+        The names of the `SCHEMA` fields which may be filtered on with
+        `filter[<field>]` query params in get_many requests. See
+        :class:`.query.QuerySpec`. If this contains `'id'`, a `filter[id]`
+        param of comma separated ids is handled by flump, see
+        :func:`.methods.get_many.GetMany.get_many`.
+
+    .. data:: SORTABLE_FIELDS
+
+        The names of the `SCHEMA` fields which may be sorted by with the
+        `sort` query param in get_many requests.
+
+    .. data:: MEMOIZE_ENTITIES
+
+        If True, entities retrieved by id through `self.fetcher` are memoized
+        for the duration of the request, so custom code such as permission
+        checks may retrieve the entity without another database query. The
+        memoized entities are forgotten whenever the view writes an entity.
+        See :class:`.fetcher.MemoizingFetcherMixin`.
+
     They MUST also provide provide `RESOURCE_NAME` & `SCHEMA` attributes that
     specify the name of the resource, and the schema to use for
     serialization/desieralization.
@@ -50,12 +113,25 @@ class FlumpView(Patch, Delete, GetMany, GetSingle, Post):
     ORM_INTEGRATION = OrmIntegration
     FETCHER = Fetcher
     PAGINATOR = BasePagination
+    TOTAL_COUNT = TotalCount.EXACT
+    COUNT_CACHE = None
+    STREAM_GET_MANY = False
+    RELATIONSHIPS = {}
+    FILTERABLE_FIELDS = frozenset()
+    MEMOIZE_ENTITIES = False
+    SORTABLE_FIELDS = frozenset()
+
+    #: The :class:`flump.FlumpBlueprint` the view has been registered on.
+    flump_blueprint = None
+    SERIALIZER = MarshmallowSerializer
     URL_MAPPING = {
         HttpMethods.GET: '{}/<entity_id>',
         HttpMethods.GET_MANY: '{}',
         HttpMethods.PATCH: '{}/<entity_id>',
         HttpMethods.POST: '{}',
-        HttpMethods.DELETE: '{}/<entity_id>'
+        HttpMethods.DELETE: '{}/<entity_id>',
+        HttpMethods.BULK_PATCH: '{}',
+        HttpMethods.BULK_DELETE: '{}'
     }
 
     def get(self, entity_id=None, **kwargs):
@@ -95,7 +171,13 @@ class FlumpView(Patch, Delete, GetMany, GetSingle, Post):
         Instance cached instantiated version of :data:`.FlumpView.FETCHER`.
         """
         if not getattr(self, '_fetcher', None):
-            self._fetcher = self.FETCHER()
+            fetcher_class = self.FETCHER
+            if self.MEMOIZE_ENTITIES:
+                fetcher_class = type(
+                    'Memoizing{}'.format(fetcher_class.__name__),
+                    (MemoizingFetcherMixin, fetcher_class), {}
+                )
+            self._fetcher = fetcher_class()
         return self._fetcher
 
     @property
@@ -104,9 +186,25 @@ class FlumpView(Patch, Delete, GetMany, GetSingle, Post):
         Instance cached instantiated version of :data:`.FlumpView.PAGINATOR`.
         """
         if not getattr(self, '_paginator', None):
-            self._paginator = self.PAGINATOR(self.fetcher)
+            fetcher = self.fetcher
+            if self.COUNT_CACHE is not None:
+                fetcher = CountCachingFetcher(fetcher, self.COUNT_CACHE,
+                                              self._view_name)
+            self._paginator = self.PAGINATOR(fetcher)
+            # Set after construction so that paginators overriding
+            # `__init__(self, fetcher)` keep working.
+            self._paginator.total_count = self.TOTAL_COUNT
         return self._paginator
 
+    @property
+    def serializer(self):
+        """
+        Instance cached instantiated version of :data:`.FlumpView.SERIALIZER`.
+        """
+        if not getattr(self, '_serializer', None):
+            self._serializer = self.SERIALIZER(self)
+        return self._serializer
+
     @property
     def orm_integration(self):
         """
@@ -116,6 +214,117 @@ class FlumpView(Patch, Delete, GetMany, GetSingle, Post):
             self._orm_integration = self.ORM_INTEGRATION()
         return self._orm_integration
 
+    @property
+    def json_backend(self):
+        """
+        The JSON backend configured on the :attr:`.FlumpView.flump_blueprint`.
+        """
+        return (getattr(self.flump_blueprint, 'json_backend', None) or
+                DEFAULT_JSON_BACKEND)
+
+    @property
+    def executor(self):
+        """
+        The executor configured on the :attr:`.FlumpView.flump_blueprint`, or
+        None if there is no executor.
+        """
+        return getattr(self.flump_blueprint, 'executor', None)
+
+    @property
+    def instrumentation(self):
+        """
+        The :class:`.instrumentation.Instrumentation` configured on the
+        :attr:`.FlumpView.flump_blueprint`, or None if instrumentation is
+        disabled.
+        """
+        return getattr(self.flump_blueprint, 'instrumentation', None)
+
+    def _time(self, phase):
+        """
+        :returns: A context manager which records the time spent within it as
+                  `phase` of the current request, if instrumentation is
+                  enabled.
+        """
+        if self.instrumentation is None:
+            return NULL_TIMER
+        timings = get_request_timings()
+        return NULL_TIMER if timings is None else timings.time(phase)
+
+    def _add_timing(self, phase, duration):
+        """
+        Adds `duration` seconds to `phase` of the current request, if
+        instrumentation is enabled and `duration` is not None.
+        """
+        if self.instrumentation is None or duration is None:
+            return
+        timings = get_request_timings()
+        if timings is not None:
+            timings.add(phase, duration)
+
+    def _make_json_response(self, data):
+        """
+        :returns: A response containing `data` encoded as JSON.
+        """
+        with self._time('encode'):
+            return make_json_response(data, self.json_backend)
+
+    @property
+    def _view_name(self):
+        return getattr(self, 'VIEW_NAME', self.RESOURCE_NAME)
+
+    def _implements_orm_hook(self, name):
+        """
+        :returns: Boolean indicating whether the ORM integration overrides
+                  the optional :class:`.orm.OrmIntegration` method `name`.
+        """
+        return (getattr(type(self.orm_integration), name) !=
+                getattr(OrmIntegration, name))
+
+    def _invalidate_entities(self):
+        """
+        Forgets any memoized entities, called once entities have been written.
+        """
+        if self.MEMOIZE_ENTITIES:
+            self.fetcher.invalidate_entities()
+
+    def _invalidate_total_count(self):
+        """
+        Invalidates any cached totals, called once entities have been
+        created or deleted.
+        """
+        if self.COUNT_CACHE is not None:
+            self.COUNT_CACHE.invalidate(self._view_name)
+
+    def _invalidate_filtered_total_count(self):
+        """
+        Invalidates any cached totals if entities may be filtered, called
+        once entities have been updated, as an update may change which
+        entities match a filter.
+        """
+        if self.FILTERABLE_FIELDS:
+            self._invalidate_total_count()
+
+    def warm_schemas(self):
+        """
+        Builds the Schema classes used by the :data:`.FlumpView.HTTP_METHODS`
+        for requests without a sparse fieldset, so that they are already
+        cached when the first request is handled.
+
+        PATCH schemas depend on the attributes sent in each request, so are
+        still built on demand.
+        """
+        methods = self.HTTP_METHODS
+        if methods & (HttpMethods.GET | HttpMethods.POST | HttpMethods.PATCH):
+            make_response_schema(self.SCHEMA)
+        if methods & (HttpMethods.GET_MANY | HttpMethods.BULK_POST):
+            make_response_schema(self.SCHEMA, many=True)
+        if HttpMethods.POST <= methods:
+            make_entity_schema(self.SCHEMA, self.RESOURCE_NAME,
+                               make_data_schema(self.SCHEMA))
+        if HttpMethods.BULK_POST <= methods:
+            make_bulk_entity_schema(self.SCHEMA, self.RESOURCE_NAME,
+                                    make_data_schema(self.SCHEMA))
+
     def _get_sparse_fieldset(self):
         """
         Returns a list of fields which have been requested to be returned.
@@ -127,6 +336,74 @@ class FlumpView(Patch, Delete, GetMany, GetSingle, Post):
             requested_fields = set(requested_fields.split(','))
             return requested_fields
 
+    def _get_includes(self):
+        """
+        Parses the `include` query param.
+
+        :returns: An :class:`.relationships.IncludedResources` for the
+                  requested relationships.
+        :raises BadRequest: If an unknown relationship is requested.
+        """
+        names = []
+        include = request.args.get('include')
+        if include:
+            for name in include.split(','):
+                if name not in self.RELATIONSHIPS:
+                    raise BadRequest(
+                        'Unknown relationship "{}" in include.'.format(name)
+                    )
+                if name not in names:
+                    names.append(name)
+        return IncludedResources(self, names)
+
+    def _get_related_view(self, name):
+        """
+        :returns: An instance of the view for the relationship `name`, which
+                  is cached on this view.
+        """
+        if not getattr(self, '_related_views', None):
+            self._related_views = {}
+        if name not in self._related_views:
+            related_view = self.RELATIONSHIPS[name].view()
+            related_view.flump_blueprint = self.flump_blueprint
+            self._related_views[name] = related_view
+        return self._related_views[name]
+
+    def _set_query_spec(self):
+        """
+        Parses the filters and sort for a get_many request, and makes them
+        available to the fetcher as :attr:`.fetcher.Fetcher.query_spec`.
+        """
+        query_spec = None
+        if self.FILTERABLE_FIELDS or self.SORTABLE_FIELDS:
+            query_spec = parse_query_spec(self.SCHEMA, self.FILTERABLE_FIELDS,
+                                          self.SORTABLE_FIELDS, request.args)
+        request_cache()[('query_spec', self.fetcher)] = query_spec
+
+    def _set_requested_fields(self, includes=None):
+        """
+        Maps the sparse fieldset onto the names of the entity attributes
+        which will be serialized, and makes them available to the fetcher as
+        :attr:`.fetcher.Fetcher.requested_fields`.
+
+        :param includes: The :class:`.relationships.IncludedResources` for
+                         the request, whose relationship attributes are also
+                         requested so the related entities can be found.
+        """
+        requested_fields = self._get_sparse_fieldset()
+        if requested_fields is not None:
+            declared_fields = self.SCHEMA._declared_fields
+            attributes = [
+                getattr(declared_fields.get(name), 'attribute', None) or name
+                for name in requested_fields
+            ]
+            if includes:
+                attributes.extend(self.RELATIONSHIPS[name].attribute
+                                  for name in includes.names)
+            requested_fields = {attribute.split('.')[0]
+                                for attribute in attributes}
+        request_cache()[('requested_fields', self.fetcher)] = requested_fields
+
     def _verify_etag(self, entity):
         """
         Verifies that the given etag is valid, if not raises a
@@ -138,6 +415,55 @@ class FlumpView(Patch, Delete, GetMany, GetSingle, Post):
         if not self._etag_matches(entity):
             raise PreconditionFailed
 
+    def _get_bulk_entities(self, entity_ids, etags, **kwargs):
+        """
+        Retrieves the entities for a bulk request using
+        :func:`.fetcher.Fetcher.get_entities`, and verifies the etag given
+        for each of them. Nothing is written unless every etag is valid.
+
+        :param entity_ids: The ids of the entities.
+        :param etags: The etag given for each entity.
+        :returns: The entities in the same order as `entity_ids`.
+        """
+        with self._time('fetch'):
+            entities = resolve(self.fetcher.get_entities(entity_ids,
+                                                         **kwargs))
+        missing = [entity_id for entity_id, entity in zip(entity_ids, entities)
+                   if not entity]
+        if missing:
+            raise NotFound('No {} found with id(s): {}'.format(
+                self.RESOURCE_NAME, ', '.join(missing)
+            ))
+
+        if not all(etags):
+            raise PreconditionRequired
+        for entity, etag in zip(entities, etags):
+            if etag not in ('*', self._get_etag(entity)):
+                raise PreconditionFailed
+        return entities
+
+    def _get_bulk_etags(self, request_data):
+        """
+        :returns: The etag given in the `meta` of each resource in the
+                  request data for a bulk request, or None for any resource
+                  without an etag.
+        """
+        etags = []
+        for resource in request_data['data']:
+            meta = resource.get('meta')
+            etags.append(meta.get('etag') if isinstance(meta, dict) else None)
+        return etags
+
+    def _raise_for_failed_match(self, entity_id, **kwargs):
+        """
+        Raises the appropriate error after a conditional write affected no
+        entity, which is a NotFound if the entity does not exist, otherwise
+        a PreconditionFailed.
+        """
+        if not resolve(self.fetcher.get_entity(entity_id, **kwargs)):
+            raise NotFound
+        raise PreconditionFailed
+
     def _get_etag(self, entity):
         """
         :returns: String of the etag for the given entity.
@@ -148,14 +474,30 @@ class FlumpView(Patch, Delete, GetMany, GetSingle, Post):
         """
         :returns: Boolean indicating whether the etag is valid.
         """
-        return any(i in request.if_match for i in (self._get_etag(entity), '*'))  # noqa
+        return self._etag_value_matches(self._get_etag(entity))
+
+    def _etag_value_matches(self, etag):
+        """
+        :returns: Boolean indicating whether the given etag string matches the
+                  If-Match header.
+        """
+        return any(i in request.if_match for i in (etag, '*'))
+
+    def _not_modified(self, etag):
+        """
+        :returns: Boolean indicating whether a GET for an entity with the
+                  given etag string should return a 304 (Not Modified), as it
+                  matches the If-None-Match or If-Match header.
+        """
+        return etag in request.if_none_match or self._etag_value_matches(etag)
 
     def _build_entity_data(self, entity):
         '''
         Builds an EntityData struct for an entity.
         '''
-        return EntityData(entity.id, self.RESOURCE_NAME,
-                          entity, EntityMetaData(self._get_etag(entity)))
+        with self._time('build'):
+            return EntityData(entity.id, self.RESOURCE_NAME,
+                              entity, EntityMetaData(self._get_etag(entity)))
 
 
 def _add_content_type(response):
@@ -175,6 +517,11 @@ class _FlumpMethodView(MethodView):
     def __init__(self, flump_view):
         self.flump_view = flump_view
 
+    def dispatch_request(self, *args, **kwargs):
+        if self.flump_view.instrumentation is not None:
+            start_request_timings(self.flump_view)
+        return super(_FlumpMethodView, self).dispatch_request(*args, **kwargs)
+
     def get(self, *args, **kwargs):
         return _add_content_type(self.flump_view.get(*args, **kwargs))
 
@@ -1,11 +1,15 @@
-from flask import current_app, request, url_for as flask_url_for
-from werkzeug.exceptions import UnsupportedMediaType
+from flask import current_app, json, request, url_for as flask_url_for
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
+
+from .json_backends import StdlibJsonBackend
 
 
 MIMETYPE = 'application/vnd.api+json'
 
 ALLOWED_MIMETYPES = {MIMETYPE, 'application/json'}
 
+DEFAULT_JSON_BACKEND = StdlibJsonBackend()
+
 
 def url_for(*args, **kwargs):
     '''
@@ -18,11 +22,64 @@ def url_for(*args, **kwargs):
     return flask_url_for(*args, **kwargs)
 
 
+def make_json_response(data, json_backend=None):
+    """
+    Builds a response containing `data` encoded as JSON, with the jsonapi
+    Content-Type.
+
+    :param data:         The data to encode.
+    :param json_backend: The JSON backend to encode with, defaults to
+                         :class:`.json_backends.StdlibJsonBackend`.
+    """
+    json_backend = json_backend or DEFAULT_JSON_BACKEND
+    return current_app.response_class(json_backend.dumps(data),
+                                      mimetype=MIMETYPE)
+
+
+def request_cache():
+    """
+    :returns: A dict which lives for the duration of the current request, used
+              for storing values we only want to compute once per request.
+    """
+    return request.environ.setdefault('flump.request_cache', {})
+
+
 def get_json():
     """
     Returns the request.json if we have the correct MIMETYPE.
+
+    The body is only checked and parsed once per request, later calls return
+    the same parsed body.
+
+    If the `FLUMP_MAX_CONTENT_LENGTH` config value is set, bodies longer than
+    that many bytes are rejected before being parsed. Bodies without a
+    Content-Length, such as chunked ones, are read no further than the limit.
     """
-    if request.mimetype and request.mimetype not in ALLOWED_MIMETYPES:
-        raise UnsupportedMediaType
+    cache = request_cache()
+    if 'json' not in cache:
+        if request.mimetype and request.mimetype not in ALLOWED_MIMETYPES:
+            raise UnsupportedMediaType
+
+        max_length = current_app.config.get('FLUMP_MAX_CONTENT_LENGTH')
+        if max_length is not None and request.content_length is None:
+            cache['json'] = _load_limited_json(max_length)
+            return cache['json']
+        if max_length is not None and request.content_length > max_length:
+            raise RequestEntityTooLarge
 
-    return request.get_json(force=True)
+        cache['json'] = request.get_json(force=True)
+    return cache['json']
+
+
+def _load_limited_json(max_length):
+    """
+    Parses the body of a request without a Content-Length, reading at most
+    one byte more than `max_length` to tell whether it is too long.
+    """
+    data = request.stream.read(max_length + 1)
+    if len(data) > max_length:
+        raise RequestEntityTooLarge
+    try:
+        return json.loads(data)
+    except ValueError as e:
+        return request.on_json_loading_failed(e)
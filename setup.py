@@ -10,7 +10,7 @@ setup(
     description='REST API builder using Flask routing and Marshmallow schemas.',
     author='Carl Henderson',
     author_email='carl@rolepoint.com',
-    packages=find_packages(exclude=['test']),
+    packages=find_packages(exclude=['test', 'benchmarks']),
     install_requires=REQUIREMENTS,
     keywords='jsonapi marshmallow api schemas endpoints json rest web http flask python3 python2',
     classifiers=[
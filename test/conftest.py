@@ -1,5 +1,6 @@
 from collections import namedtuple
 import json
+import sys
 import uuid
 
 from flask import Flask, Response
@@ -11,6 +12,9 @@ from flump import FlumpView, FlumpBlueprint, MIMETYPE, OrmIntegration, Fetcher
 
 User = namedtuple('User', ('id', 'etag', 'name', 'age'))
 
+# Coroutine fetchers and ORM integrations require `async def`.
+collect_ignore = ['test_async.py'] if sys.version_info < (3, 5) else []
+
 
 @pytest.fixture
 def database():
@@ -85,10 +89,15 @@ class FlumpTestResponse(Response):
         return json.loads(self.data.decode('utf-8'))
 
 
+@pytest.fixture
+def blueprint_kwargs():
+    return {}
+
+
 @pytest.yield_fixture
-def app(view_and_schema):
+def app(view_and_schema, blueprint_kwargs):
     view_class, schema, _ = view_and_schema
-    blueprint = FlumpBlueprint('flump', __name__)
+    blueprint = FlumpBlueprint('flump', __name__, **blueprint_kwargs)
     blueprint.register_flump_view(view_class, '/user/')
 
     app = Flask(__name__)
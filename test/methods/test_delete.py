@@ -1,3 +1,10 @@
+import json
+
+import pytest
+
+from flump import HttpMethods, MIMETYPE
+from flump.web_utils import url_for
+
 from ..helpers import create_user, delete_user
 
 
@@ -45,3 +52,86 @@ def test_delete_fails_with_wrong_id(flask_client):
         flask_client, 'totallynotanid', etag='wrong-etag'
     )
     assert response.status_code == 404
+
+
+class TestAtomicDelete:
+    @pytest.fixture
+    def orm_integration(self, orm_integration, database):
+        class AtomicOrmIntegration(orm_integration):
+            def delete_entity_if_match(self, entity_id, etags):
+                for i, entity in enumerate(database):
+                    if entity.id == entity_id and str(entity.etag) in etags:
+                        database.pop(i)
+                        return True
+                return False
+
+            def delete_entity(self, entity):
+                raise AssertionError('delete_entity should not be called')
+
+        return AtomicOrmIntegration
+
+    def test_delete(self, flask_client, database):
+        test_delete(flask_client)
+        assert not database
+
+    def test_delete_works_with_wildcard_etag(self, flask_client):
+        test_delete_works_with_wildcard_etag(flask_client)
+
+    def test_delete_fails_with_incorrect_etag(self, flask_client):
+        test_delete_fails_with_incorrect_etag(flask_client)
+
+    def test_delete_fails_with_wrong_id(self, flask_client):
+        test_delete_fails_with_wrong_id(flask_client)
+
+
+class TestBulkDelete:
+    @pytest.fixture
+    def view_and_schema(self, view_and_schema):
+        view, schema, instances = view_and_schema
+
+        class BulkView(view):
+            HTTP_METHODS = HttpMethods.ALL | HttpMethods.BULK_DELETE
+
+        return BulkView, schema, instances
+
+    def delete_many(self, flask_client, identifiers):
+        return flask_client.delete(
+            url_for('flump.user', _method='GET'),
+            data=json.dumps({'data': identifiers}),
+            headers=[('Content-Type', MIMETYPE)]
+        )
+
+    def test_delete_many(self, flask_client, orm_integration, database,
+                         mocker):
+        etag = create_user(flask_client).headers['Etag'].strip('"')
+        create_user(flask_client)
+        delete_entities = mocker.spy(orm_integration, 'delete_entities')
+
+        response = self.delete_many(flask_client, [
+            {'type': 'user', 'id': '2', 'meta': {'etag': '*'}},
+            {'type': 'user', 'id': '1', 'meta': {'etag': etag}}
+        ])
+
+        assert response.status_code == 204
+        assert not database
+        assert delete_entities.call_count == 1
+
+    def test_delete_many_verifies_every_etag(self, flask_client, database):
+        etag = create_user(flask_client).headers['Etag'].strip('"')
+        create_user(flask_client)
+
+        response = self.delete_many(flask_client, [
+            {'type': 'user', 'id': '1', 'meta': {'etag': etag}},
+            {'type': 'user', 'id': '2', 'meta': {'etag': 'wrong-etag'}}
+        ])
+
+        assert response.status_code == 412
+        assert len(database) == 2
+
+    def test_delete_many_fails_with_invalid_identifiers(self, flask_client):
+        response = self.delete_many(flask_client, [{'type': 'user'}])
+
+        assert response.status_code == 422
+        assert response.json['errors'] == {
+            'data': {'0': {'id': ['Missing data for required field.']}}
+        }
@@ -1,10 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from flask import request
+from marshmallow import fields
 from mock import ANY
 import pytest
 
+from flump.cache import CountCache
 from flump.web_utils import url_for
-from flump.pagination import PageSizePagination
+from flump.pagination import (BasePagination, CursorPagination,
+                              PageSizePagination, PaginationContext,
+                              TotalCount)
 
-from ..helpers import create_user
+from ..helpers import create_user, patch_user
 
 
 class TestGetManyDefault:
@@ -160,6 +168,20 @@ class TestGetManyWithPagination:
             }
         }
 
+    def test_get_many_only_counts_entities_once(self, flask_client, fetcher,
+                                                 mocker):
+        for _ in range(3):
+            create_user(flask_client)
+
+        count = mocker.spy(fetcher, 'get_total_entities')
+        parse = mocker.spy(PageSizePagination, 'get_pagination_args')
+        response = flask_client.get(url_for('flump.user', _method='GET'))
+
+        assert response.status_code == 200
+        assert response.json['meta']['total_count'] == 3
+        assert count.call_count == 1
+        assert parse.call_count == 1
+
     def test_invalid_page_number(self, flask_client):
         response = flask_client.get(
             url_for('flump.user', _method='GET'),
@@ -179,3 +201,537 @@ class TestGetManyWithPagination:
         assert response.json == {
             'message': 'Both page[number] and page[size] must be at least 1'
         }
+
+
+class TestGetManyWithCursorPagination:
+    @pytest.fixture
+    def fetcher(self, fetcher, database):
+        class KeysetFetcher(fetcher):
+            def get_many_entities(self, pagination_args, **kwargs):
+                if pagination_args.before is not None:
+                    entities = [e for e in database
+                                if int(e.id) < pagination_args.before]
+                    return entities[-pagination_args.size:]
+
+                after = pagination_args.after or 0
+                entities = [e for e in database if int(e.id) > after]
+                return entities[:pagination_args.size]
+
+        return KeysetFetcher
+
+    @pytest.fixture
+    def stream_get_many(self):
+        return False
+
+    @pytest.fixture
+    def view_and_schema(self, view_and_schema, fetcher, stream_get_many):
+        view, schema, instances = view_and_schema
+
+        class Paginator(CursorPagination):
+            DEFAULT_PAGE_SIZE = 2
+
+            def get_cursor(self, entity):
+                return int(entity.id)
+
+        class ViewWithPagination(view):
+            PAGINATOR = Paginator
+            FETCHER = fetcher
+            STREAM_GET_MANY = stream_get_many
+
+        return ViewWithPagination, schema, instances
+
+    @pytest.fixture
+    def app(self, app):
+        app.secret_key = 'secret'
+        return app
+
+    def get_ids(self, response):
+        return [entity['id'] for entity in response.json['data']]
+
+    def follow(self, flask_client, link):
+        url, query_string = link.split('?')
+        return flask_client.get(url, query_string=query_string)
+
+    def test_get_many_follows_cursors(self, flask_client, fetcher, mocker):
+        for _ in range(5):
+            create_user(flask_client)
+        count = mocker.spy(fetcher, 'get_total_entities')
+
+        response = flask_client.get(url_for('flump.user', _method='GET'))
+
+        assert response.status_code == 200
+        assert self.get_ids(response) == ['1', '2']
+        assert response.json['meta'] == {'extra': {'size': 2}}
+        links = response.json['links']
+        assert links['prev'] is None
+        assert 'last' not in links
+
+        response = self.follow(flask_client, links['next'])
+        assert self.get_ids(response) == ['3', '4']
+
+        response = self.follow(flask_client, response.json['links']['next'])
+        assert self.get_ids(response) == ['5']
+        assert response.json['links']['next'] is None
+
+        response = self.follow(flask_client, response.json['links']['prev'])
+        assert self.get_ids(response) == ['3', '4']
+
+        assert count.call_count == 0
+
+    def test_tampered_cursor_is_rejected(self, flask_client):
+        response = flask_client.get(
+            url_for('flump.user', _method='GET'),
+            query_string='page[after]=3'
+        )
+        assert response.status_code == 400
+
+    def test_after_and_before_are_exclusive(self, flask_client):
+        paginator = CursorPagination(None)
+        with flask_client.application.test_request_context():
+            cursor = paginator.encode_cursor(1)
+
+        response = flask_client.get(
+            url_for('flump.user', _method='GET'),
+            query_string={'page[after]': cursor, 'page[before]': cursor}
+        )
+        assert response.status_code == 400
+
+    def test_invalid_page_size_is_rejected(self, flask_client):
+        response = flask_client.get(
+            url_for('flump.user', _method='GET'),
+            query_string={'page[size]': 'abc'}
+        )
+        assert response.status_code == 400
+
+    def test_missing_secret_key_is_reported(self, flask_client, app):
+        app.secret_key = None
+        with app.test_request_context():
+            with pytest.raises(RuntimeError) as excinfo:
+                CursorPagination(None).encode_cursor(1)
+        assert 'SECRET_KEY' in str(excinfo.value)
+
+
+class TestGetManyTotalCountPolicy:
+    @pytest.fixture
+    def fetcher(self, fetcher, database):
+        class PaginatedFetcher(fetcher):
+            def get_many_entities(self, pagination_args, **kwargs):
+                start = (pagination_args.page - 1) * pagination_args.size
+                return database[start:start + pagination_args.size]
+
+            def estimate_total_entities(self, **kwargs):
+                return 100
+
+        return PaginatedFetcher
+
+    @pytest.fixture
+    def total_count(self):
+        return TotalCount.EXACT
+
+    @pytest.fixture
+    def view_and_schema(self, view_and_schema, fetcher, total_count):
+        view, schema, instances = view_and_schema
+
+        class Paginator(PageSizePagination):
+            DEFAULT_PAGE_SIZE = 2
+
+        class ViewWithCountPolicy(view):
+            PAGINATOR = Paginator
+            FETCHER = fetcher
+            TOTAL_COUNT = total_count
+
+        return ViewWithCountPolicy, schema, instances
+
+    def get_many(self, flask_client, query_string=''):
+        for _ in range(3):
+            create_user(flask_client)
+        return flask_client.get(url_for('flump.user', _method='GET'),
+                                query_string=query_string)
+
+    @pytest.mark.parametrize('total_count', [TotalCount.NEVER])
+    def test_never_counts(self, flask_client, fetcher, mocker):
+        count = mocker.spy(fetcher, 'get_total_entities')
+        response = self.get_many(flask_client)
+
+        assert response.status_code == 200
+        assert 'total_count' not in response.json['meta']
+        assert response.json['links']['last'] is None
+        assert response.json['links']['next'].endswith(
+            'page%5Bnumber%5D=2&page%5Bsize%5D=2'
+        )
+        assert count.call_count == 0
+
+    @pytest.mark.parametrize('total_count', [TotalCount.NEVER])
+    def test_no_next_link_for_partial_page(self, flask_client):
+        response = self.get_many(flask_client, 'page[number]=2')
+
+        assert response.json['links']['next'] is None
+
+    @pytest.mark.parametrize('total_count', [TotalCount.ON_REQUEST])
+    def test_counts_on_request(self, flask_client):
+        response = self.get_many(flask_client)
+        assert 'total_count' not in response.json['meta']
+
+        response = flask_client.get(url_for('flump.user', _method='GET'),
+                                    query_string='meta[total]=true')
+        assert response.json['meta']['total_count'] == 3
+
+    @pytest.mark.parametrize('total_count', [TotalCount.ESTIMATE])
+    def test_uses_estimate(self, flask_client, fetcher, mocker):
+        count = mocker.spy(fetcher, 'get_total_entities')
+        response = self.get_many(flask_client)
+
+        assert response.json['meta']['total_count'] == 100
+        assert count.call_count == 0
+
+
+class TestGetManyWithPaginatorOverrides:
+    @pytest.fixture
+    def view_and_schema(self, view_and_schema):
+        view, schema, instances = view_and_schema
+
+        class Paginator(PageSizePagination):
+            DEFAULT_PAGE_SIZE = 2
+
+            def __init__(self, fetcher):
+                super(Paginator, self).__init__(fetcher)
+
+            def get_pagination_links(self, **kwargs):
+                links = super(Paginator, self).get_pagination_links(**kwargs)
+                links['self'] = 'http://localhost/overridden'
+                return links
+
+        class ViewWithPaginatorOverrides(view):
+            PAGINATOR = Paginator
+            TOTAL_COUNT = TotalCount.NEVER
+
+        return ViewWithPaginatorOverrides, schema, instances
+
+    def test_get_many(self, flask_client):
+        for _ in range(3):
+            create_user(flask_client)
+
+        response = flask_client.get(url_for('flump.user', _method='GET'))
+
+        assert response.status_code == 200
+        assert 'total_count' not in response.json['meta']
+        assert response.json['links']['self'] == 'http://localhost/overridden'
+        assert response.json['links']['next'].endswith(
+            'page%5Bnumber%5D=2&page%5Bsize%5D=2'
+        )
+
+
+class TestGetManyWithCountCache:
+    @pytest.fixture
+    def view_and_schema(self, view_and_schema):
+        view, schema, instances = view_and_schema
+
+        class ViewWithCountCache(view):
+            COUNT_CACHE = CountCache()
+
+        return ViewWithCountCache, schema, instances
+
+    def test_caches_count_until_entities_are_created(self, flask_client,
+                                                      fetcher, mocker):
+        create_user(flask_client)
+        count = mocker.spy(fetcher, 'get_total_entities')
+
+        for _ in range(2):
+            response = flask_client.get(url_for('flump.user', _method='GET'))
+            assert response.json['meta']['total_count'] == 1
+        assert count.call_count == 1
+
+        create_user(flask_client)
+        response = flask_client.get(url_for('flump.user', _method='GET'))
+        assert response.json['meta']['total_count'] == 2
+        assert count.call_count == 2
+
+
+class TestGetManyStreamed:
+    @pytest.fixture
+    def view_and_schema(self, view_and_schema):
+        view, schema, instances = view_and_schema
+
+        class StreamingView(view):
+            STREAM_GET_MANY = True
+
+        return StreamingView, schema, instances
+
+    def test_get_many(self, flask_client):
+        for _ in range(3):
+            create_user(flask_client)
+
+        response = flask_client.get(url_for('flump.user', _method='GET'))
+
+        assert response.is_streamed
+        assert response.status_code == 200
+        assert response.json == {
+            'meta': {'total_count': 3},
+            'data': [
+                {
+                    'attributes': {'name': 'Carl', 'age': 26},
+                    'id': str(i), 'type': 'user', 'meta': {'etag': ANY}
+                }
+                for i in range(1, 4)
+            ],
+            'links': {'self': 'http://localhost/tester/user'}
+        }
+
+    def test_get_when_none_exist(self, flask_client):
+        response = flask_client.get(url_for('flump.user', _method='GET'))
+
+        assert response.json == {
+            'meta': {'total_count': 0},
+            'data': [],
+            'links': {'self': 'http://localhost/tester/user'}
+        }
+
+
+class TestGetManyStreamedWithCursorPagination(
+        TestGetManyWithCursorPagination):
+    @pytest.fixture
+    def stream_get_many(self):
+        return True
+
+
+class TestGetManyRequestedFields:
+    @pytest.fixture
+    def view_and_schema(self, view_and_schema):
+        view, schema, instances = view_and_schema
+
+        class SchemaWithAttribute(schema):
+            years = fields.Integer(attribute='age', dump_only=True)
+
+        class ViewWithAttribute(view):
+            SCHEMA = SchemaWithAttribute
+
+        return ViewWithAttribute, SchemaWithAttribute, instances
+
+    def test_maps_sparse_fieldset_to_attributes(self, flask_client, fetcher,
+                                                mocker):
+        create_user(flask_client)
+        requested = []
+
+        def get_many_entities(self, pagination_args, **kwargs):
+            requested.append(self.requested_fields)
+            return []
+        mocker.patch.object(fetcher, 'get_many_entities', get_many_entities)
+
+        flask_client.get(url_for('flump.user', _method='GET'))
+        flask_client.get(url_for('flump.user', _method='GET',
+                                 **{'fields[user]': 'name,years'}))
+
+        assert requested == [None, {'name', 'age'}]
+
+
+class TestGetManyEtags:
+    def test_returns_not_modified_for_same_etag(self, flask_client):
+        create_user(flask_client)
+        url = url_for('flump.user', _method='GET')
+        etag = flask_client.get(url).headers['Etag']
+
+        response = flask_client.get(url, headers=[('If-None-Match', etag)])
+        assert response.status_code == 304
+
+        create_user(flask_client)
+        response = flask_client.get(url, headers=[('If-None-Match', etag)])
+        assert response.status_code == 200
+        assert response.headers['Etag'] != etag
+
+    def test_etag_depends_on_sparse_fieldset(self, flask_client):
+        create_user(flask_client)
+        etag = flask_client.get(url_for('flump.user', _method='GET'))
+        sparse_etag = flask_client.get(
+            url_for('flump.user', _method='GET', **{'fields[user]': 'name'})
+        )
+        assert etag.headers['Etag'] != sparse_etag.headers['Etag']
+
+    def test_uses_collection_etag(self, flask_client, fetcher, database,
+                                  mocker):
+        mocker.patch.object(fetcher, 'get_collection_etag',
+                            lambda self, pagination_args: len(database))
+        create_user(flask_client)
+        url = url_for('flump.user', _method='GET')
+        etag = flask_client.get(url).headers['Etag']
+
+        get_many_entities = mocker.spy(fetcher, 'get_many_entities')
+        response = flask_client.get(url, headers=[('If-None-Match', etag)])
+
+        assert response.status_code == 304
+        assert not get_many_entities.called
+
+
+class TestGetManyById:
+    @pytest.fixture
+    def view_and_schema(self, view_and_schema):
+        view, schema, instances = view_and_schema
+
+        class IdFilterableView(view):
+            FILTERABLE_FIELDS = {'id'}
+
+        return IdFilterableView, schema, instances
+
+    def test_returns_entities_in_requested_order(self, flask_client, fetcher,
+                                                 mocker):
+        for _ in range(3):
+            create_user(flask_client)
+        get_entities = mocker.spy(fetcher, 'get_entities')
+        get_many_entities = mocker.spy(fetcher, 'get_many_entities')
+
+        response = flask_client.get(
+            url_for('flump.user', _method='GET', **{'filter[id]': '3,1,9,3'})
+        )
+
+        assert response.status_code == 200
+        assert [e['id'] for e in response.json['data']] == ['3', '1']
+        assert response.json['meta'] == {'total_count': 2}
+        assert response.headers['Etag']
+        assert get_entities.call_count == 1
+        assert not get_many_entities.called
+
+    def test_rejects_more_ids_than_max_page_size(self, flask_client):
+        entity_ids = ','.join(str(i) for i in range(101))
+
+        response = flask_client.get(
+            url_for('flump.user', _method='GET', **{'filter[id]': entity_ids})
+        )
+
+        assert response.status_code == 400
+
+
+def test_filter_by_id_is_left_to_the_fetcher_by_default(flask_client, fetcher,
+                                                       mocker):
+    create_user(flask_client)
+    get_many_entities = mocker.spy(fetcher, 'get_many_entities')
+
+    response = flask_client.get(
+        url_for('flump.user', _method='GET', **{'filter[id]': '2'})
+    )
+
+    assert response.status_code == 200
+    assert get_many_entities.call_count == 1
+
+
+class TestGetManyQuerySpec:
+    @pytest.fixture
+    def view_and_schema(self, view_and_schema):
+        view, schema, instances = view_and_schema
+
+        class FilterableView(view):
+            FILTERABLE_FIELDS = {'name'}
+            SORTABLE_FIELDS = {'age'}
+            COUNT_CACHE = CountCache()
+
+        return FilterableView, schema, instances
+
+    @pytest.fixture
+    def fetcher(self, fetcher, database):
+        class FilteringFetcher(fetcher):
+            def _filter(self):
+                spec = self.query_spec
+                entities = [e for e in database
+                            if all(getattr(e, f.attribute) == f.value
+                                   for f in spec.filters)]
+                for sort in reversed(spec.sort):
+                    entities.sort(key=lambda e: getattr(e, sort.attribute),
+                                  reverse=sort.descending)
+                return entities
+
+            def get_total_entities(self, **kwargs):
+                return len(self._filter())
+
+            def get_many_entities(self, pagination_args, **kwargs):
+                return self._filter()
+
+        return FilteringFetcher
+
+    @pytest.fixture
+    def orm_integration(self, orm_integration, database):
+        class UpdatingOrmIntegration(orm_integration):
+            def update_entity(self, existing_entity, data):
+                entity = existing_entity._replace(**data)
+                database[int(entity.id) - 1] = entity
+                return entity
+
+        return UpdatingOrmIntegration
+
+    def test_filters_and_sorts(self, flask_client):
+        create_user(flask_client)
+        create_user(flask_client, data={'data': {
+            'type': 'user', 'attributes': {'name': 'Carly', 'age': 30}
+        }})
+        create_user(flask_client, data={'data': {
+            'type': 'user', 'attributes': {'name': 'Carl', 'age': 40}
+        }})
+
+        response = flask_client.get(url_for(
+            'flump.user', _method='GET', sort='-age',
+            **{'filter[name]': 'Carl'}
+        ))
+        assert [e['id'] for e in response.json['data']] == ['3', '1']
+        assert response.json['meta'] == {'total_count': 2}
+
+        response = flask_client.get(url_for('flump.user', _method='GET'))
+        assert response.json['meta'] == {'total_count': 3}
+
+    def test_updates_invalidate_filtered_totals(self, flask_client):
+        etag = create_user(flask_client).headers['Etag']
+        url = url_for('flump.user', _method='GET', **{'filter[name]': 'Carl'})
+        assert flask_client.get(url).json['meta'] == {'total_count': 1}
+
+        assert patch_user(flask_client, '1', etag=etag).status_code == 200
+
+        assert flask_client.get(url).json['meta'] == {'total_count': 0}
+
+    def test_invalid_filter(self, flask_client):
+        response = flask_client.get(url_for(
+            'flump.user', _method='GET', **{'filter[age]': '1'}
+        ))
+        assert response.status_code == 400
+
+
+class TestGetManyWithExecutor:
+    @pytest.fixture
+    def executor(self):
+        executor = ThreadPoolExecutor(max_workers=2)
+        yield executor
+        executor.shutdown()
+
+    @pytest.fixture
+    def app(self, app, executor):
+        app.blueprints['flump'].executor = executor
+        return app
+
+    def test_counts_on_executor(self, flask_client, fetcher, mocker):
+        for _ in range(3):
+            create_user(flask_client)
+        threads = []
+        get_total_entities = fetcher.get_total_entities
+
+        def record_thread(self, **kwargs):
+            threads.append(threading.current_thread())
+            assert request.path == '/tester/user'
+            return get_total_entities(self, **kwargs)
+        mocker.patch.object(fetcher, 'get_total_entities', record_thread)
+
+        response = flask_client.get(url_for('flump.user', _method='GET'))
+
+        assert response.json['meta'] == {'total_count': 3}
+        assert threads and threads[0] is not threading.current_thread()
+
+    def test_request_is_torn_down_once(self, app, flask_client):
+        teardowns = []
+        app.teardown_request(lambda exc: teardowns.append(exc))
+
+        response = flask_client.get(url_for('flump.user', _method='GET'))
+
+        assert response.json['meta'] == {'total_count': 0}
+        assert teardowns == [None]
+
+    def test_records_timings(self, app, fetcher, executor):
+        with app.test_request_context('/'):
+            context = PaginationContext(BasePagination(fetcher()), {})
+            context.prefetch_total(executor)
+
+            assert context.total == 0
+            assert context.timings['count'] >= 0
@@ -1,6 +1,11 @@
 from mock import ANY
+import pytest
 
-from ..helpers import create_user, get_user
+from flump.serializers import CompiledSerializer
+
+from flump.web_utils import url_for
+
+from ..helpers import create_user, delete_user, get_user
 
 
 def test_get(flask_client):
@@ -26,6 +31,134 @@ def test_get_returns_not_modified_for_same_etag(flask_client):
     assert not response.data
 
 
+def test_get_returns_not_modified_for_if_none_match(flask_client):
+    create_user(flask_client)
+    etag = get_user(flask_client, '1').headers['Etag']
+
+    response = flask_client.get(
+        url_for('flump.user', entity_id='1', _method='GET'),
+        headers=[('If-None-Match', etag)]
+    )
+    assert response.status_code == 304
+    response = flask_client.get(
+        url_for('flump.user', entity_id='1', _method='GET'),
+        headers=[('If-None-Match', '"other"')]
+    )
+    assert response.status_code == 200
+
+
 def test_get_fails_if_entity_does_not_exist(flask_client):
     response = get_user(flask_client, '1')
     assert response.status_code == 404
+
+
+class TestGetSingleCompiledSerializer:
+    @pytest.fixture
+    def view_and_schema(self, view_and_schema):
+        view, schema, instances = view_and_schema
+
+        class ViewWithCompiledSerializer(view):
+            SERIALIZER = CompiledSerializer
+
+        return ViewWithCompiledSerializer, schema, instances
+
+    def test_get(self, flask_client):
+        test_get(flask_client)
+
+
+class TestGetSingleRequestedFields:
+    @pytest.fixture
+    def fetcher(self, fetcher):
+        class RecordingFetcher(fetcher):
+            requested = []
+
+            def get_entity(self, entity_id):
+                self.requested.append(self.requested_fields)
+                return super(RecordingFetcher, self).get_entity(entity_id)
+
+        return RecordingFetcher
+
+    def test_passes_sparse_fieldset_to_fetcher(self, flask_client, fetcher):
+        create_user(flask_client)
+        get_user(flask_client, '1')
+        response = flask_client.get('/tester/user/1?fields[user]=name')
+
+        assert response.json['data']['attributes'] == {'name': 'Carl'}
+        assert fetcher.requested == [None, {'name'}]
+        assert fetcher().requested_fields is None
+
+
+class TestGetSingleWithEtagLookup:
+    @pytest.fixture
+    def fetcher(self, fetcher, database):
+        class EtagFetcher(fetcher):
+            def get_entity_etag(self, entity_id):
+                if int(entity_id) <= len(database):
+                    return database[int(entity_id) - 1].etag
+
+        return EtagFetcher
+
+    def test_not_modified_does_not_load_entity(self, flask_client, fetcher,
+                                               mocker):
+        create_user(flask_client)
+        etag = get_user(flask_client, '1').headers['Etag']
+
+        get_entity = mocker.spy(fetcher, 'get_entity')
+        response = get_user(flask_client, '1', etag=etag)
+
+        assert response.status_code == 304
+        assert not get_entity.called
+
+    def test_loads_entity_if_etag_does_not_match(self, flask_client):
+        create_user(flask_client)
+        response = get_user(flask_client, '1', etag='"other"')
+
+        assert response.status_code == 200
+        assert get_user(flask_client, '2', etag='"other"').status_code == 404
+
+
+class TestGetSingleMemoizedEntities:
+    @pytest.fixture
+    def read_after_delete(self):
+        return []
+
+    @pytest.fixture
+    def view_and_schema(self, view_and_schema, read_after_delete):
+        view, schema, instances = view_and_schema
+
+        class MemoizingView(view):
+            MEMOIZE_ENTITIES = True
+
+            def get_single(self, entity_id=None, **kwargs):
+                # Mimics a permission check which loads the entity.
+                assert self.fetcher.get_entity(entity_id)
+                return super(MemoizingView, self).get_single(entity_id,
+                                                             **kwargs)
+
+            def delete(self, entity_id=None, **kwargs):
+                assert self.fetcher.get_entity(entity_id)
+                response = super(MemoizingView, self).delete(entity_id,
+                                                             **kwargs)
+                # Reads the entity again after it has been deleted.
+                read_after_delete.append(self.fetcher.get_entity(entity_id))
+                return response
+
+        return MemoizingView, schema, instances
+
+    def test_entity_is_fetched_once_per_request(self, flask_client, fetcher,
+                                                mocker):
+        create_user(flask_client)
+        get_entity = mocker.spy(fetcher, 'get_entity')
+
+        assert get_user(flask_client, '1').status_code == 200
+        assert get_user(flask_client, '1').status_code == 200
+        assert get_entity.call_count == 2
+
+    def test_writes_invalidate_entities(self, flask_client, fetcher, mocker,
+                                        read_after_delete):
+        etag = create_user(flask_client).headers['Etag']
+        get_entity = mocker.spy(fetcher, 'get_entity')
+
+        assert delete_user(flask_client, '1', etag=etag).status_code == 204
+        assert read_after_delete == [None]
+        assert get_entity.call_count == 2
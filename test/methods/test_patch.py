@@ -1,4 +1,10 @@
+import json
+
 from mock import ANY
+import pytest
+
+from flump import HttpMethods, MIMETYPE
+from flump.web_utils import url_for
 
 from ..helpers import create_user, patch_user
 
@@ -104,6 +110,17 @@ def test_patch_fails_with_wrong_id(flask_client):
     assert response.status_code == 404
 
 
+def test_entity_is_checked_before_loading_data(flask_client):
+    create_user(flask_client)
+    data = {'data': {'type': 'user', 'id': '1',
+                     'attributes': {'age': 'notanint'}}}
+
+    assert patch_user(flask_client, '2', data=data,
+                      etag='wrong-etag').status_code == 404
+    assert patch_user(flask_client, '1', data=data,
+                      etag='wrong-etag').status_code == 412
+
+
 def test_patch_fails_with_bad_content_type(flask_client):
     create_response = create_user(flask_client)
     response = patch_user(
@@ -112,3 +129,121 @@ def test_patch_fails_with_bad_content_type(flask_client):
     )
 
     assert response.status_code == 415
+
+
+class TestAtomicPatch:
+    @pytest.fixture
+    def orm_integration(self, orm_integration, database):
+        class AtomicOrmIntegration(orm_integration):
+            def update_entity_if_match(self, entity_id, etags, data):
+                for i, entity in enumerate(database):
+                    if entity.id == entity_id and str(entity.etag) in etags:
+                        database[i] = entity._replace(**data)
+                        return database[i]
+
+            def update_entity(self, existing_entity, data):
+                raise AssertionError('update_entity should not be called')
+
+        return AtomicOrmIntegration
+
+    def test_patch(self, flask_client, database):
+        test_patch(flask_client)
+        assert database[0].name == 'Carly'
+
+    def test_patch_works_with_wildcard_etag(self, flask_client):
+        test_patch_works_with_wildcard_etag(flask_client)
+
+    def test_patch_fails_with_incorrect_etag(self, flask_client):
+        test_patch_fails_with_incorrect_etag(flask_client)
+
+    def test_patch_fails_with_wrong_id(self, flask_client):
+        test_patch_fails_with_wrong_id(flask_client)
+
+
+class TestBulkPatch:
+    @pytest.fixture
+    def view_and_schema(self, view_and_schema):
+        view, schema, instances = view_and_schema
+
+        class BulkView(view):
+            HTTP_METHODS = HttpMethods.ALL | HttpMethods.BULK_PATCH
+
+        return BulkView, schema, instances
+
+    def patch_many(self, flask_client, resources):
+        return flask_client.patch(
+            url_for('flump.user', _method='PATCH'),
+            data=json.dumps({'data': resources}),
+            headers=[('Content-Type', MIMETYPE)]
+        )
+
+    def test_patch_many(self, flask_client, fetcher, mocker):
+        etags = [create_user(flask_client).headers['Etag'].strip('"')
+                 for _ in range(2)]
+        get_entities = mocker.spy(fetcher, 'get_entities')
+
+        response = self.patch_many(flask_client, [
+            {'type': 'user', 'id': '2', 'meta': {'etag': etags[1]},
+             'attributes': {'name': 'Carly'}},
+            {'type': 'user', 'id': '1', 'meta': {'etag': '*'},
+             'attributes': {'age': 27}}
+        ])
+
+        assert response.status_code == 200
+        assert response.json == {
+            'data': [
+                {
+                    'attributes': {'name': 'Carly', 'age': 26},
+                    'id': '2', 'type': 'user', 'meta': {'etag': etags[1]}
+                },
+                {
+                    'attributes': {'name': 'Carl', 'age': 27},
+                    'id': '1', 'type': 'user', 'meta': {'etag': etags[0]}
+                }
+            ],
+            'links': {'self': 'http://localhost/tester/user'}
+        }
+        assert get_entities.call_count == 1
+
+    def test_patch_many_verifies_every_etag(self, flask_client,
+                                            orm_integration, mocker):
+        etag = create_user(flask_client).headers['Etag'].strip('"')
+        create_user(flask_client)
+        update_entities = mocker.spy(orm_integration, 'update_entities')
+
+        response = self.patch_many(flask_client, [
+            {'type': 'user', 'id': '1', 'meta': {'etag': etag},
+             'attributes': {'name': 'Carly'}},
+            {'type': 'user', 'id': '2', 'meta': {'etag': 'wrong-etag'},
+             'attributes': {'name': 'Carly'}}
+        ])
+        assert response.status_code == 412
+
+        response = self.patch_many(flask_client, [
+            {'type': 'user', 'id': '1', 'attributes': {'name': 'Carly'}}
+        ])
+        assert response.status_code == 428
+
+        response = self.patch_many(flask_client, [
+            {'type': 'user', 'id': '3', 'meta': {'etag': '*'},
+             'attributes': {'name': 'Carly'}}
+        ])
+        assert response.status_code == 404
+        assert not update_entities.called
+
+    def test_patch_many_returns_errors_by_index(self, flask_client):
+        create_user(flask_client)
+        response = self.patch_many(flask_client, [
+            {'type': 'user', 'id': '1', 'meta': {'etag': '*'},
+             'attributes': {'age': 'x'}}
+        ])
+
+        assert response.status_code == 422
+        assert response.json['errors'] == {
+            'data': {'0': {'attributes': {'age': ['Not a valid integer.']}}}
+        }
+
+
+def test_patch_many_is_not_enabled_by_default(flask_client):
+    response = flask_client.patch(url_for('flump.user', _method='GET'))
+    assert response.status_code == 405
@@ -118,3 +118,74 @@ def test_post_only_view_works(flask_client):
         headers=[('Content-Type', 'application/json')]
     )
     assert response.status_code == 201
+
+
+class TestBulkPost:
+    @pytest.fixture
+    def view_and_schema(self, view_and_schema):
+        view, schema, instances = view_and_schema
+
+        class BulkView(view):
+            HTTP_METHODS = HttpMethods.ALL | HttpMethods.BULK_POST
+
+        return BulkView, schema, instances
+
+    def test_post_many(self, flask_client, orm_integration, mocker):
+        create_entities = mocker.spy(orm_integration, 'create_entities')
+        data = {
+            'data': [
+                {'type': 'user', 'attributes': {'name': 'Carl', 'age': 26}},
+                {'type': 'user', 'attributes': {'name': 'Carly', 'age': 27}}
+            ]
+        }
+        response = create_user(flask_client, data=data)
+
+        assert response.status_code == 201
+        assert response.json == {
+            'data': [
+                {
+                    'attributes': {'name': 'Carl', 'age': 26},
+                    'type': 'user', 'id': '1', 'meta': {'etag': ANY}
+                },
+                {
+                    'attributes': {'name': 'Carly', 'age': 27},
+                    'type': 'user', 'id': '2', 'meta': {'etag': ANY}
+                }
+            ],
+            'links': {'self': 'http://localhost/tester/user'}
+        }
+        assert create_entities.call_count == 1
+
+    def test_post_many_returns_errors_by_index(self, flask_client, database):
+        data = {
+            'data': [
+                {'type': 'user', 'attributes': {'name': 'Carl', 'age': 26}},
+                {'type': 'user', 'attributes': {'name': 'Carly', 'age': 'x'}}
+            ]
+        }
+        response = create_user(flask_client, data=data)
+
+        assert response.status_code == 422
+        assert response.json['errors'] == {
+            'data': {'1': {'attributes': {'age': ['Not a valid integer.']}}}
+        }
+        assert not database
+
+    def test_post_many_fails_if_an_id_is_specified(self, flask_client):
+        data = {
+            'data': [{'type': 'user', 'id': '1',
+                      'attributes': {'name': 'Carl', 'age': 26}}]
+        }
+        response = create_user(flask_client, data=data)
+        assert response.status_code == 403
+
+    def test_post_single(self, flask_client):
+        test_post(flask_client)
+
+
+def test_post_many_is_not_enabled_by_default(flask_client):
+    data = {
+        'data': [{'type': 'user', 'attributes': {'name': 'Carl', 'age': 26}}]
+    }
+    response = create_user(flask_client, data=data)
+    assert response.status_code == 422
@@ -0,0 +1,143 @@
+import asyncio
+import uuid
+
+import pytest
+
+from flump import Fetcher, OrmIntegration
+from flump.async_utils import gather, resolve
+from flump.web_utils import request_cache, url_for
+
+from .conftest import User
+from .helpers import create_user, delete_user, get_user, patch_user
+
+
+@pytest.fixture
+def events():
+    return []
+
+
+@pytest.fixture
+def orm_integration(database):
+    class AsyncOrmIntegration(OrmIntegration):
+        async def delete_entity(self, entity):
+            database.pop(int(entity.id) - 1)
+
+        async def create_entity(self, data):
+            entity = User(str(len(database) + 1), uuid.uuid4(),
+                          data['name'], data['age'])
+            database.append(entity)
+            return entity
+
+        async def update_entity(self, existing_entity, data):
+            # Fails if the future was created on a different event loop.
+            await request_cache()['fetched']
+            return existing_entity._replace(**data)
+
+    return AsyncOrmIntegration
+
+
+@pytest.fixture
+def connection():
+    return {}
+
+
+@pytest.fixture
+def fetcher(database, events, connection):
+    class AsyncFetcher(Fetcher):
+        async def get_entity(self, entity_id):
+            await asyncio.sleep(0)
+            # Mimics a driver reusing a connection bound to the loop it was
+            # opened on.
+            loop = connection.setdefault('loop', asyncio.get_event_loop())
+            fetched = loop.create_future()
+            asyncio.get_event_loop().call_soon(fetched.set_result, None)
+            await fetched
+            request_cache()['fetched'] = fetched
+            if int(entity_id) <= len(database):
+                return database[int(entity_id) - 1]
+
+        async def get_total_entities(self, **kwargs):
+            events.append('count started')
+            await asyncio.sleep(0)
+            events.append('count finished')
+            return len(database)
+
+        async def get_many_entities(self, pagination_args, **kwargs):
+            events.append('page started')
+            await asyncio.sleep(0)
+            events.append('page finished')
+            return database
+
+    return AsyncFetcher
+
+
+def test_gather_resolves_awaitables_in_order():
+    async def double(value):
+        await asyncio.sleep(0)
+        return value * 2
+
+    assert gather(double(1), 3, double(2)) == [2, 3, 4]
+    assert resolve(5) == 5
+
+
+def test_get_single(flask_client):
+    create_user(flask_client)
+
+    response = get_user(flask_client, '1')
+
+    assert response.status_code == 200
+    assert response.json['data']['attributes'] == {'name': 'Carl', 'age': 26}
+
+
+def test_connections_are_reused_across_requests(flask_client):
+    create_user(flask_client)
+
+    assert get_user(flask_client, '1').status_code == 200
+    assert get_user(flask_client, '1').status_code == 200
+
+
+def test_get_single_not_found(flask_client):
+    assert get_user(flask_client, '1').status_code == 404
+
+
+def test_get_many_awaits_count_and_page_concurrently(flask_client, events):
+    create_user(flask_client)
+    create_user(flask_client)
+
+    response = flask_client.get(url_for('flump.user', _method='GET'))
+
+    assert response.status_code == 200
+    assert len(response.json['data']) == 2
+    assert response.json['meta'] == {'total_count': 2}
+    assert events[:2] == ['page started', 'count started']
+
+
+def test_patch(flask_client):
+    etag = create_user(flask_client).headers['Etag']
+
+    response = patch_user(flask_client, '1', etag=etag)
+
+    assert response.status_code == 200
+    assert response.json['data']['attributes'] == {'name': 'Carly',
+                                                   'age': 27}
+
+
+def test_gather_uses_one_loop_per_thread(app):
+    async def get_loop():
+        return asyncio.get_event_loop()
+
+    with app.test_request_context(url_for('flump.user', _method='GET')):
+        first = resolve(get_loop())
+        assert resolve(get_loop()) is first
+    with app.test_request_context(url_for('flump.user', _method='GET')):
+        assert resolve(get_loop()) is first
+    assert not first.is_closed()
+
+
+def test_delete(flask_client, database):
+    etag = create_user(flask_client).headers['Etag']
+
+    response = delete_user(flask_client, '1', etag=etag)
+
+    assert response.status_code == 204
+    assert database == []
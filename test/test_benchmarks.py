@@ -0,0 +1,22 @@
+from benchmarks.compare import compare
+from benchmarks.run import build_scenarios, run
+
+
+def test_run_smoke():
+    results = run(iterations=1, warmup=1)
+
+    assert ([result['name'] for result in results['results']] ==
+            [scenario.name for scenario in build_scenarios()])
+    get_many = next(result for result in results['results']
+                    if result['name'].startswith('get_many'))
+    assert {'count', 'fetch', 'dump', 'total'} <= set(get_many['phases'])
+
+
+def test_compare_flags_regressions():
+    def results(p50):
+        return {'results': [{'name': 'get_single', 'latency': {'p50': p50}}]}
+
+    [(name, _, _, _, regressed)] = compare(results(1.0), results(1.05))
+    assert (name, regressed) == ('get_single', False)
+    [(name, _, _, _, regressed)] = compare(results(1.0), results(1.5))
+    assert (name, regressed) == ('get_single', True)
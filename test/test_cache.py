@@ -0,0 +1,76 @@
+from flump.cache import CountCache, LRUCache, MemoryCacheBackend
+
+
+def test_get_or_create_only_builds_once():
+    cache = LRUCache()
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return 'value'
+
+    assert cache.get_or_create('key', factory) == 'value'
+    assert cache.get_or_create('key', factory) == 'value'
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    # Touch 'a' so that 'b' becomes the least recently used entry.
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert len(cache) == 2
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert 'c' in cache
+
+
+def test_clear_resets_counters():
+    cache = LRUCache()
+    cache.get('missing')
+    cache.set('a', 1)
+    cache.clear()
+
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_memory_backend_expires_entries(mocker):
+    time = mocker.patch('flump.cache.time.time', return_value=100)
+    backend = MemoryCacheBackend()
+    backend.set('expires', 1, timeout=10)
+    backend.set('forever', 2, timeout=0)
+
+    time.return_value = 111
+    assert backend.get('expires') is None
+    assert backend.get('forever') == 2
+
+
+def test_count_cache_caches_per_kwargs():
+    cache = CountCache()
+    counts = []
+
+    def count(**kwargs):
+        counts.append(kwargs)
+        return len(counts)
+
+    assert cache.get_total('user', {'org': '1'}, count) == 1
+    assert cache.get_total('user', {'org': '1'}, count) == 1
+    assert cache.get_total('user', {'org': '2'}, count) == 2
+    assert cache.get_total('comment', {'org': '1'}, count) == 3
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_count_cache_invalidates_namespace():
+    cache = CountCache()
+    cache.get_total('user', {}, lambda: 1)
+    cache.get_total('comment', {}, lambda: 1)
+
+    cache.invalidate('user')
+
+    assert cache.get_total('user', {}, lambda: 2) == 2
+    assert cache.get_total('comment', {}, lambda: 2) == 1
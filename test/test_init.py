@@ -1,6 +1,8 @@
 from flask import Flask, url_for
+from marshmallow import fields, Schema
 
 from flump import FlumpView, FlumpBlueprint, HttpMethods
+from flump.schemas import SCHEMA_CACHE, make_data_schema
 
 
 class ViewForTest(FlumpView):
@@ -23,6 +25,12 @@ def test_flump_blueprint():
     assert set(rules) == {'/endpoint', '/endpoint/<entity_id>'}
 
 
+def test_flump_blueprint_with_logging():
+    blueprint = FlumpBlueprint('test_flump', __name__, logging=True)
+
+    assert blueprint.after_request_funcs[None]
+
+
 def test_flump_view_decorator():
     blueprint = FlumpBlueprint('test_flump', __name__)
 
@@ -88,3 +96,36 @@ def test_uses_view_name_if_present():
 
     with app.test_request_context('/'):
         assert url_for('test_flump.totally_unique_name')
+
+
+class SchemaView(ViewForTest):
+    class SCHEMA(Schema):
+        name = fields.Str()
+
+
+def test_warm_schemas_builds_schemas_on_registration():
+    blueprint = FlumpBlueprint('test_flump', __name__, warm_schemas=True)
+    blueprint.register_flump_view(SchemaView, '/endpoint')
+
+    assert ('response', SchemaView.SCHEMA, None, False) in SCHEMA_CACHE
+    assert ('response', SchemaView.SCHEMA, None, True) in SCHEMA_CACHE
+
+
+def test_warm_builds_schemas_for_registered_views():
+    class ReadOnlyView(SchemaView):
+        HTTP_METHODS = HttpMethods.READ_ONLY
+
+        class SCHEMA(Schema):
+            name = fields.Str()
+
+    blueprint = FlumpBlueprint('test_flump', __name__)
+    blueprint.register_flump_view(ReadOnlyView, '/endpoint')
+
+    assert ('response', ReadOnlyView.SCHEMA, None, True) not in SCHEMA_CACHE
+
+    blueprint.warm()
+
+    assert ('response', ReadOnlyView.SCHEMA, None, True) in SCHEMA_CACHE
+    post_key = ('entity', ReadOnlyView.SCHEMA, 'blah',
+                make_data_schema(ReadOnlyView.SCHEMA))
+    assert post_key not in SCHEMA_CACHE
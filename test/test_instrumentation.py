@@ -0,0 +1,93 @@
+import pytest
+
+from flump import FlumpBlueprint
+from flump.instrumentation import NULL_TIMER, Instrumentation
+from flump.web_utils import url_for
+
+from .helpers import create_user, get_user, patch_user
+
+
+class RecordingInstrumentation(Instrumentation):
+    def __init__(self, **kwargs):
+        super(RecordingInstrumentation, self).__init__(**kwargs)
+        self.finished = []
+
+    def request_finished(self, timings, response):
+        self.finished.append((timings, response.status_code))
+
+
+@pytest.fixture
+def instrumentation():
+    return RecordingInstrumentation()
+
+
+@pytest.fixture
+def blueprint_kwargs(instrumentation):
+    return {'instrumentation': instrumentation}
+
+
+def get_phases(response):
+    return [metric.split(';')[0]
+            for metric in response.headers['Server-Timing'].split(', ')]
+
+
+def test_get_single_timings(flask_client, instrumentation):
+    create_user(flask_client)
+
+    response = get_user(flask_client, '1')
+
+    assert get_phases(response) == ['fetch', 'build', 'dump', 'encode',
+                                    'total']
+    timings, status = instrumentation.finished[-1]
+    assert (timings.method, status) == ('GET', 200)
+    assert timings.flump_view.RESOURCE_NAME == 'user'
+    assert all(duration >= 0 for duration in timings.durations.values())
+
+
+def test_get_many_timings(flask_client):
+    create_user(flask_client)
+
+    response = flask_client.get(url_for('flump.user', _method='GET'))
+
+    assert get_phases(response) == ['pagination', 'fetch', 'build', 'count',
+                                    'dump', 'encode', 'total']
+
+
+def test_write_timings(flask_client):
+    response = create_user(flask_client)
+
+    assert get_phases(response) == ['load', 'write', 'build', 'dump',
+                                    'encode', 'total']
+
+    response = patch_user(flask_client, '1', etag=response.headers['Etag'])
+
+    assert get_phases(response) == ['fetch', 'load', 'write', 'build', 'dump',
+                                    'encode', 'total']
+
+
+def test_errors_are_timed(flask_client, instrumentation):
+    response = get_user(flask_client, '1')
+
+    assert response.status_code == 404
+    assert get_phases(response) == ['fetch', 'total']
+    assert instrumentation.finished[-1][1] == 404
+
+
+@pytest.mark.parametrize('instrumentation', [
+    RecordingInstrumentation(server_timing=False)
+])
+def test_server_timing_can_be_disabled(flask_client, instrumentation):
+    response = create_user(flask_client)
+
+    assert 'Server-Timing' not in response.headers
+    assert instrumentation.finished
+
+
+def test_no_timings_without_instrumentation(view_and_schema):
+    view_class, _, _ = view_and_schema
+    blueprint = FlumpBlueprint('uninstrumented', __name__)
+    blueprint.register_flump_view(view_class, '/user/')
+    view = blueprint.flump_views[0]
+
+    assert not blueprint.after_request_funcs
+    assert view._time('fetch') is NULL_TIMER
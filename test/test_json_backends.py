@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+from decimal import Decimal
+import json
+import uuid
+
+import pytest
+
+try:
+    from flask.json.provider import DefaultJSONProvider
+except ImportError:  # Flask < 2.2
+    DefaultJSONProvider = None
+
+from flump import FlumpBlueprint
+from flump.json_backends import (best_available, orjson, OrjsonBackend,
+                                 StdlibJsonBackend)
+from flump.web_utils import url_for
+
+from .helpers import create_user, get_user
+
+
+DATA = {
+    'data': {'name': u'Carl ☃', 'age': 26, 'tags': ['a', None]},
+    'uuid': uuid.UUID('c6b8ebde-1e9a-4a94-a4cf-53e39ba2eac1'),
+    'decimal': Decimal('1.50'),
+    'date': datetime(2017, 1, 2, 3, 4, 5),
+}
+
+EXPECTED = {
+    'data': {'name': u'Carl ☃', 'age': 26, 'tags': ['a', None]},
+    'uuid': 'c6b8ebde-1e9a-4a94-a4cf-53e39ba2eac1',
+    'decimal': '1.50',
+    'date': 'Mon, 02 Jan 2017 03:04:05 GMT',
+}
+
+
+def test_stdlib_backend_encodes_compact_bytes():
+    encoded = StdlibJsonBackend().dumps({'a': [1, 2]})
+    assert encoded == b'{"a":[1,2]}'
+
+
+def test_stdlib_backend_encodes_extra_types():
+    assert json.loads(StdlibJsonBackend().dumps(DATA).decode()) == EXPECTED
+
+
+@pytest.mark.skipif(DefaultJSONProvider is None,
+                    reason='Flask does not support JSON providers')
+def test_stdlib_backend_uses_app_json_provider(app):
+    class Point(object):
+        pass
+
+    class PointJSONProvider(DefaultJSONProvider):
+        @staticmethod
+        def default(obj):
+            if isinstance(obj, Point):
+                return 'point'
+            return DefaultJSONProvider.default(obj)
+
+    app.json = PointJSONProvider(app)
+
+    assert StdlibJsonBackend().dumps({'a': Point()}) == b'{"a":"point"}'
+
+
+@pytest.mark.skipif(orjson is None, reason='orjson is not installed')
+def test_orjson_backend_matches_stdlib():
+    assert json.loads(OrjsonBackend().dumps(DATA).decode()) == EXPECTED
+    assert isinstance(best_available(), OrjsonBackend)
+
+
+@pytest.mark.skipif(orjson is None, reason='orjson is not installed')
+def test_orjson_backend_encodes_non_string_keys():
+    errors = {'errors': {0: {'name': ['Missing data.']}}}
+
+    assert OrjsonBackend().dumps(errors) == StdlibJsonBackend().dumps(errors)
+
+
+class RecordingBackend(StdlibJsonBackend):
+    def __init__(self):
+        self.encoded = []
+
+    def dumps(self, obj):
+        self.encoded.append(obj)
+        return super(RecordingBackend, self).dumps(obj)
+
+
+@pytest.fixture
+def json_backend():
+    return RecordingBackend()
+
+
+@pytest.fixture
+def app(app, view_and_schema, json_backend):
+    view_class, _, _ = view_and_schema
+    blueprint = FlumpBlueprint('custom_json', __name__,
+                               json_backend=json_backend)
+    blueprint.register_flump_view(view_class, '/user/')
+    app.register_blueprint(blueprint, url_prefix='/custom')
+    return app
+
+
+def test_blueprint_uses_json_backend(flask_client, json_backend):
+    create_user(flask_client)
+    response = flask_client.get(
+        url_for('custom_json.user', entity_id='1', _method='GET')
+    )
+
+    assert response.status_code == 200
+    assert response.json['data']['id'] == '1'
+    assert json_backend.encoded[-1]['data']['id'] == '1'
+
+    response = flask_client.get(
+        url_for('custom_json.user', entity_id='2', _method='GET')
+    )
+    assert response.status_code == 404
+    assert 'message' in json_backend.encoded[-1]
+
+
+def test_default_backend_is_compact(flask_client):
+    create_user(flask_client)
+    response = get_user(flask_client, '1')
+
+    assert b'\n' not in response.data
+    assert response.headers['Content-Type'] == 'application/vnd.api+json'
@@ -0,0 +1,140 @@
+import gc
+import threading
+
+import pytest
+
+from flump.cache import CountCache
+from flump.instrumentation import RequestTimings
+from flump.metrics import MetricsRegistry
+from flump.web_utils import url_for
+
+from .helpers import create_user, get_user
+
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry(buckets=(0.1, 1.0))
+
+
+@pytest.fixture
+def view_and_schema(view_and_schema):
+    view, schema, database = view_and_schema
+
+    class CountCachingView(view):
+        COUNT_CACHE = CountCache()
+
+    return CountCachingView, schema, database
+
+
+@pytest.fixture
+def blueprint_kwargs(metrics):
+    return {'metrics': metrics, 'metrics_url': '/metrics'}
+
+
+def test_counters_are_merged_across_threads(metrics):
+    def record():
+        metrics.inc('requests', (('view', 'user'), ))
+
+    threads = [threading.Thread(target=record) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    record()
+
+    assert metrics.counters() == {('requests', (('view', 'user'), )): 4}
+
+
+def test_shards_of_finished_threads_are_merged(metrics):
+    def record():
+        metrics.inc('requests')
+        metrics.observe('latency', (), 0.5)
+
+    for _ in range(3):
+        thread = threading.Thread(target=record)
+        thread.start()
+        thread.join()
+    del thread
+    gc.collect()
+
+    assert not metrics._shards
+    assert metrics.counters() == {('requests', ()): 3}
+    assert metrics.histograms() == {('latency', ()): ((0, 3, 3), 3, 1.5)}
+
+
+def test_histogram_buckets_are_cumulative(metrics):
+    for value in (0.05, 0.1, 0.5, 2):
+        metrics.observe('latency', (), value)
+
+    assert metrics.histograms() == {('latency', ()): ((2, 3, 4), 4, 2.65)}
+
+
+def test_render(metrics):
+    metrics.inc('flump_requests_total', (('view', 'us"er'), ))
+    metrics.observe('flump_request_duration_seconds', (), 0.5)
+
+    lines = metrics.render().splitlines()
+
+    assert lines[0] == '# TYPE flump_cache_hits_total counter'
+    assert lines[1].startswith('flump_cache_hits_total{cache="query_shape"} ')
+    assert '# TYPE flump_requests_total counter' in lines
+    assert 'flump_requests_total{view="us\\"er"} 1' in lines
+    assert lines[-6:] == [
+        '# TYPE flump_request_duration_seconds histogram',
+        'flump_request_duration_seconds_bucket{le="0.1"} 0',
+        'flump_request_duration_seconds_bucket{le="1.0"} 1',
+        'flump_request_duration_seconds_bucket{le="+Inf"} 1',
+        'flump_request_duration_seconds_count 1',
+        'flump_request_duration_seconds_sum 0.5',
+    ]
+
+
+def test_records_requests(flask_client, metrics):
+    create_user(flask_client)
+    create_user(flask_client)
+    response = flask_client.get(url_for('flump.user', _method='GET'))
+    get_user(flask_client, '3')
+
+    counters = metrics.counters()
+    get_labels = (('view', 'user'), ('method', 'GET'))
+    assert counters[('flump_requests_total',
+                     get_labels + (('status', '200'), ))] == 1
+    assert counters[('flump_requests_total',
+                     get_labels + (('status', '404'), ))] == 1
+    assert counters[('flump_requests_total', (
+        ('view', 'user'), ('method', 'POST'), ('status', '201')
+    ))] == 2
+    assert counters[('flump_entities_serialized_total', get_labels)] == 2
+    assert counters[('flump_response_bytes_total', get_labels)] >= (
+        response.content_length
+    )
+    assert metrics.histograms()[
+        ('flump_request_duration_seconds', get_labels)
+    ][1] == 2
+    assert 'Server-Timing' not in response.headers
+
+
+def test_views_are_labelled_by_view_name(app, view_and_schema, metrics):
+    class AdminView(view_and_schema[0]):
+        VIEW_NAME = 'admin_user'
+
+    timings = RequestTimings(AdminView(), 'GET')
+    timings.finish()
+    metrics.record_request(timings, app.response_class(status=200))
+
+    assert metrics.counters() == {('flump_requests_total', (
+        ('view', 'admin_user'), ('method', 'GET'), ('status', '200')
+    )): 1}
+
+
+def test_metrics_route(flask_client):
+    flask_client.get(url_for('flump.user', _method='GET'))
+
+    response = flask_client.get(url_for('flump.metrics'))
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.data.decode('utf-8')
+    assert ('flump_requests_total{view="user",method="GET",status="200"} 1'
+            in text)
+    assert 'flump_count_cache_misses_total{view="user"} 1' in text
@@ -0,0 +1,60 @@
+from marshmallow import fields, Schema
+import pytest
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import BadRequest
+
+from flump.query import (Filter, QUERY_SHAPE_CACHE, QuerySpec, Sort,
+                         parse_query_spec)
+
+
+class UserSchema(Schema):
+    name = fields.Str()
+    age = fields.Integer()
+    years = fields.Integer(attribute='age')
+
+
+def parse(**args):
+    return parse_query_spec(UserSchema, ['name', 'age', 'years'],
+                            ['name', 'years'], MultiDict(args))
+
+
+def test_parses_filters_and_sort():
+    spec = parse(**{'filter[name]': 'Carl', 'filter[years][gte]': '18',
+                    'filter[age][in]': '1,2', 'filter[id]': '1',
+                    'sort': '-years,name', 'other': 'x'})
+
+    assert spec == QuerySpec(
+        (Filter('age', 'in', (1, 2)), Filter('name', 'eq', 'Carl'),
+         Filter('age', 'gte', 18)),
+        (Sort('age', True), Sort('name', False))
+    )
+
+
+def test_shape_ignores_values():
+    QUERY_SHAPE_CACHE.clear()
+    first = parse(**{'filter[age][gt]': '1', 'sort': 'name'})
+    second = parse(**{'filter[age][gt]': '2', 'sort': 'name'})
+
+    assert first.shape == second.shape
+    assert first.values != second.values
+    assert QUERY_SHAPE_CACHE.hits == 1
+
+
+@pytest.mark.parametrize('args', [
+    {'filter[secret]': '1'},
+    {'filter[age][like]': '1'},
+    {'filter[age]': 'old'},
+    {'filter[age]x': '1'},
+    {'sort': 'age'},
+])
+def test_invalid_queries_are_rejected(args):
+    with pytest.raises(BadRequest):
+        parse(**args)
+
+
+def test_ignores_params_without_allowed_fields():
+    spec = parse_query_spec(UserSchema, [], [], MultiDict(
+        {'filter[name]': 'Carl', 'sort': 'name'}
+    ))
+
+    assert spec == QuerySpec((), ())
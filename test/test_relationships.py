@@ -0,0 +1,191 @@
+from collections import namedtuple
+
+from marshmallow import fields, Schema
+from mock import ANY
+import pytest
+
+from flump import Fetcher, FlumpBlueprint, FlumpView, HttpMethods
+from flump.relationships import Relationship
+from flump.web_utils import url_for
+
+from .helpers import create_user
+
+
+Article = namedtuple('Article', ('id', 'etag', 'title', 'author_id',
+                                 'reviewer_ids'))
+
+
+@pytest.fixture
+def articles():
+    return [Article('1', 'etag-1', 'First', '1', ['2', '1']),
+            Article('2', 'etag-2', 'Second', '1', [])]
+
+
+@pytest.fixture(params=[False, True], ids=['buffered', 'streamed'])
+def stream_get_many(request):
+    return request.param
+
+
+@pytest.fixture
+def app(view_and_schema, app, articles, stream_get_many):
+    user_view, _, _ = view_and_schema
+
+    class ArticleFetcher(Fetcher):
+        def get_entity(self, entity_id):
+            return next((a for a in articles if a.id == entity_id), None)
+
+        def get_total_entities(self, **kwargs):
+            return len(articles)
+
+        def get_many_entities(self, pagination_args, **kwargs):
+            return articles
+
+        def get_entity_etag(self, entity_id):
+            return self.get_entity(entity_id).etag
+
+        def get_collection_etag(self, pagination_args, **kwargs):
+            return 'articles'
+
+    class ArticleView(FlumpView):
+        RESOURCE_NAME = 'article'
+        FETCHER = ArticleFetcher
+        HTTP_METHODS = HttpMethods.READ_ONLY
+        STREAM_GET_MANY = stream_get_many
+        RELATIONSHIPS = {
+            'author': Relationship(user_view, 'author_id'),
+            'reviewers': Relationship(user_view, 'reviewer_ids', many=True)
+        }
+
+        class SCHEMA(Schema):
+            title = fields.Str()
+
+    blueprint = FlumpBlueprint('articles', __name__)
+    blueprint.register_flump_view(ArticleView, '/article/')
+    app.register_blueprint(blueprint, url_prefix='/tester')
+    return app
+
+
+def make_user(entity_id, name='Carl'):
+    return {
+        'type': 'user', 'id': entity_id, 'meta': {'etag': ANY},
+        'attributes': {'name': name, 'age': 26}
+    }
+
+
+def test_get_many_includes_related_entities(flask_client, fetcher, mocker):
+    create_user(flask_client)
+    create_user(flask_client)
+    get_entities = mocker.spy(fetcher, 'get_entities')
+
+    response = flask_client.get(url_for(
+        'articles.article', _method='GET', include='author,reviewers'
+    ))
+
+    assert response.status_code == 200
+    assert [r['relationships'] for r in response.json['data']] == [
+        {
+            'author': {'data': {'type': 'user', 'id': '1'}},
+            'reviewers': {'data': [{'type': 'user', 'id': '2'},
+                                   {'type': 'user', 'id': '1'}]}
+        },
+        {
+            'author': {'data': {'type': 'user', 'id': '1'}},
+            'reviewers': {'data': []}
+        }
+    ]
+    assert response.json['included'] == [make_user('1'), make_user('2')]
+    # One batched call for each relationship, rather than one per article.
+    assert get_entities.call_count == 2
+
+
+def test_get_single_includes_sparse_related_entities(flask_client):
+    create_user(flask_client)
+
+    response = flask_client.get(url_for(
+        'articles.article', entity_id='1', _method='GET',
+        include='author', **{'fields[user]': 'name'}
+    ))
+
+    assert response.status_code == 200
+    assert response.json['data']['relationships'] == {
+        'author': {'data': {'type': 'user', 'id': '1'}}
+    }
+    assert response.json['included'] == [{
+        'type': 'user', 'id': '1', 'meta': {'etag': ANY},
+        'attributes': {'name': 'Carl'}
+    }]
+
+
+def test_no_included_without_include(flask_client):
+    response = flask_client.get(url_for('articles.article', _method='GET'))
+
+    assert 'included' not in response.json
+    assert 'relationships' not in response.json['data'][0]
+
+
+def test_unknown_include_is_rejected(flask_client):
+    response = flask_client.get(url_for(
+        'articles.article', _method='GET', include='editor'
+    ))
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('entity_id', [None, '1'], ids=['many', 'single'])
+def test_etag_changes_with_included_entities(flask_client, database,
+                                             entity_id, stream_get_many):
+    if entity_id is None and stream_get_many:
+        pytest.skip('Streamed compound documents have no etag.')
+    create_user(flask_client)
+    create_user(flask_client)
+    url = url_for('articles.article', entity_id=entity_id, _method='GET',
+                  include='author')
+    etag = flask_client.get(url).headers['Etag']
+
+    not_modified = flask_client.get(url, headers=[('If-None-Match', etag)])
+    assert not_modified.status_code == 304
+
+    database[0] = database[0]._replace(etag='changed')
+    response = flask_client.get(url, headers=[('If-None-Match', etag)])
+    assert response.status_code == 200
+    assert response.headers['Etag'] != etag
+
+
+def test_etag_includes_relationship_names(flask_client):
+    create_user(flask_client)
+    url = url_for('articles.article', entity_id='1', _method='GET')
+
+    etag = flask_client.get(url).headers['Etag']
+
+    assert flask_client.get(url_for(
+        'articles.article', entity_id='1', _method='GET', include='author'
+    )).headers['Etag'] != etag
+
+
+@pytest.mark.parametrize('entity_id', [None, '1'], ids=['many', 'single'])
+def test_relationship_attributes_are_requested(flask_client, app, entity_id):
+    create_user(flask_client)
+    fetcher = app.blueprints['articles'].flump_views[0].fetcher
+    requested = []
+
+    def get_entity(entity_id):
+        requested.append(fetcher.requested_fields)
+        return type(fetcher).get_entity(fetcher, entity_id)
+
+    def get_many_entities(pagination_args, **kwargs):
+        requested.append(fetcher.requested_fields)
+        return type(fetcher).get_many_entities(fetcher, pagination_args)
+
+    fetcher.get_entity = get_entity
+    fetcher.get_many_entities = get_many_entities
+
+    response = flask_client.get(url_for(
+        'articles.article', entity_id=entity_id, _method='GET',
+        include='author', **{'fields[article]': 'title'}
+    ))
+
+    assert response.json['included'] == [{
+        'type': 'user', 'id': '1', 'meta': {'etag': ANY},
+        'attributes': {'name': 'Carl', 'age': 26}
+    }]
+    assert requested == [{'title', 'author_id'}]
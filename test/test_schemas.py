@@ -0,0 +1,39 @@
+from marshmallow import fields, Schema
+
+from flump.schemas import (make_data_schema, make_entity_schema,
+                           make_response_schema)
+
+
+class UserSchema(Schema):
+    name = fields.Str()
+    age = fields.Integer()
+
+
+def test_make_data_schema_reuses_schema_classes():
+    assert make_data_schema(UserSchema) is make_data_schema(UserSchema)
+    assert (make_data_schema(UserSchema, only=['name']) is
+            make_data_schema(UserSchema, only={'name'}))
+
+
+def test_make_data_schema_distinguishes_variants():
+    assert (make_data_schema(UserSchema) is not
+            make_data_schema(UserSchema, only={'name'}))
+    assert (make_data_schema(UserSchema) is not
+            make_data_schema(UserSchema, partial=True))
+    assert (make_data_schema(UserSchema) is not
+            make_data_schema(UserSchema, id_required=True))
+
+
+def test_make_response_schema_reuses_schema_classes():
+    assert (make_response_schema(UserSchema, many=True) is
+            make_response_schema(UserSchema, many=True))
+    assert (make_response_schema(UserSchema) is not
+            make_response_schema(UserSchema, many=True))
+
+
+def test_make_entity_schema_reuses_schema_classes():
+    data_schema = make_data_schema(UserSchema)
+    assert (make_entity_schema(UserSchema, 'user', data_schema) is
+            make_entity_schema(UserSchema, 'user', data_schema))
+    assert (make_entity_schema(UserSchema, 'user', data_schema) is not
+            make_entity_schema(UserSchema, 'person', data_schema))
@@ -0,0 +1,129 @@
+from collections import namedtuple
+import datetime
+
+from marshmallow import fields, post_dump, Schema
+import pytest
+
+from flump import FlumpView
+from flump.schemas import (EntityData, EntityMetaData, ManyResponseData,
+                           ResponseData)
+from flump.serializers import (CompiledSerializer, CompiledSchema,
+                               MarshmallowSerializer)
+
+
+Article = namedtuple('Article', ('id', 'etag', 'title', 'views', 'score',
+                                 'published', 'created', 'tags'))
+
+
+class ArticleSchema(Schema):
+    title = fields.Str()
+    views = fields.Integer()
+    score = fields.Float(as_string=True)
+    published = fields.Boolean()
+    created = fields.DateTime()
+    tags = fields.List(fields.Str())
+    heading = fields.Str(attribute='title', dump_to='headline')
+    secret = fields.Str(load_only=True)
+    missing_with_default = fields.Str(default='a default')
+
+
+class ArticleObject(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def make_article(entity_id, **kwargs):
+    values = dict(
+        id=entity_id, etag='etag-{}'.format(entity_id), title=u'Title',
+        views='10', score=1.5, published=1,
+        created=datetime.datetime(2017, 1, 1), tags=['a', 'b']
+    )
+    values.update(kwargs)
+    return Article(**values)
+
+
+class ArticleView(FlumpView):
+    RESOURCE_NAME = 'article'
+    SCHEMA = ArticleSchema
+
+
+def make_entity_data(entity):
+    return EntityData(entity.id, 'article', entity,
+                      EntityMetaData(entity.etag))
+
+
+@pytest.fixture
+def views():
+    return ArticleView(), ArticleView()
+
+
+def dump_both(views, method, response_data):
+    marshmallow_view, compiled_view = views
+    marshmallow_dump = getattr(MarshmallowSerializer(marshmallow_view),
+                               method)(response_data)
+    compiled_dump = getattr(CompiledSerializer(compiled_view),
+                            method)(response_data)
+    return marshmallow_dump, compiled_dump
+
+
+@pytest.mark.parametrize('query_string', ['', 'fields[article]=title,views'])
+def test_compiled_single_matches_marshmallow(app, views, query_string):
+    response_data = ResponseData(make_entity_data(make_article(1)),
+                                 {'self': 'http://localhost/article/1'})
+    with app.test_request_context('/', query_string=query_string):
+        marshmallow_dump, compiled_dump = dump_both(views, 'dump',
+                                                    response_data)
+
+    assert compiled_dump == marshmallow_dump
+
+
+def test_compiled_many_matches_marshmallow(app, views):
+    entities = [make_article(1), make_article(2, views=3, published=False),
+                make_article(3, title=None, views=None)]
+    response_data = ManyResponseData(
+        [make_entity_data(e) for e in entities],
+        {'self': 'http://localhost/article', 'next': None},
+        {'total_count': 3, 'extra': {'page': 1}}
+    )
+    with app.test_request_context('/'):
+        marshmallow_dump, compiled_dump = dump_both(views, 'dump_many',
+                                                    response_data)
+
+    assert compiled_dump == marshmallow_dump
+
+
+def test_compiled_matches_marshmallow_for_objects(app, views):
+    entity = ArticleObject(**make_article(1)._asdict())
+    del entity.tags
+    response_data = ResponseData(make_entity_data(entity), {})
+    with app.test_request_context('/'):
+        marshmallow_dump, compiled_dump = dump_both(views, 'dump',
+                                                    response_data)
+
+    assert compiled_dump == marshmallow_dump
+
+
+def test_compiled_schema_splits_simple_fields():
+    compiled = CompiledSchema(ArticleSchema)
+
+    assert not compiled.use_marshmallow
+    assert {f[0] for f in compiled.simple_fields} == {
+        'title', 'views', 'published', 'headline', 'missing_with_default'
+    }
+    assert {f[0] for f in compiled.other_fields} == {
+        'score', 'created', 'tags'
+    }
+
+
+def test_compiled_schema_falls_back_to_marshmallow():
+    class SchemaWithProcessor(ArticleSchema):
+        @post_dump
+        def upper_title(self, data):
+            data['title'] = data['title'].upper()
+            return data
+
+    assert CompiledSchema(SchemaWithProcessor).use_marshmallow
+    assert CompiledSchema(ArticleSchema, frozenset(['etag'])).use_marshmallow
+
+    dump = CompiledSchema(SchemaWithProcessor).make_dumper()
+    assert dump(make_article(1))['title'] == 'TITLE'
@@ -1,9 +1,14 @@
+from io import BytesIO
 import json
+import logging
 
+from flask.testing import EnvironBuilder
 import pytest
-from werkzeug.exceptions import UnsupportedMediaType
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
 
-from flump.web_utils import MIMETYPE, get_json
+from flump.web_utils import MIMETYPE, get_json, url_for
+
+from .helpers import create_user
 
 
 def run_test(app, mimetype):
@@ -22,3 +27,76 @@ def test_get_json_works_for_expected_mimetypes(mimetype, app):
 def test_get_json_raises_for_incorrect_mimetype(app):
     with pytest.raises(UnsupportedMediaType):
         run_test(app, 'memetype')
+
+
+def test_get_json_parses_body_once(app, mocker):
+    get_json_spy = mocker.spy(app.request_class, 'get_json')
+    data = json.dumps({'a': 'b'})
+    with app.test_request_context('/user/', data=data,
+                                  headers={'Content-Type': MIMETYPE}):
+        assert get_json() is get_json()
+        assert get_json_spy.call_count == 1
+
+
+def test_get_json_enforces_max_content_length(app):
+    app.config['FLUMP_MAX_CONTENT_LENGTH'] = 10
+    data = json.dumps({'a': 'a long value'})
+    with app.test_request_context('/user/', data=data,
+                                  headers={'Content-Type': MIMETYPE}):
+        with pytest.raises(RequestEntityTooLarge):
+            get_json()
+
+
+def make_chunked_environ(app, body, path='/user/', method='GET'):
+    builder = EnvironBuilder(app, path, method=method, input_stream=body,
+                             headers={'Content-Type': MIMETYPE})
+    environ = builder.get_environ()
+    del environ['CONTENT_LENGTH']
+    environ['wsgi.input_terminated'] = True
+    return environ
+
+
+def chunked_request_context(app, body):
+    return app.request_context(make_chunked_environ(app, body))
+
+
+def test_get_json_reads_chunked_body_within_max_content_length(app):
+    app.config['FLUMP_MAX_CONTENT_LENGTH'] = 10
+    with chunked_request_context(app, BytesIO(b'{"a": "b"}')):
+        assert get_json() == {'a': 'b'}
+
+
+def test_get_json_stops_reading_chunked_body_at_max_content_length(app):
+    app.config['FLUMP_MAX_CONTENT_LENGTH'] = 10
+    body = BytesIO(json.dumps({'a': 'x' * 1000}).encode('utf-8'))
+    with chunked_request_context(app, body):
+        with pytest.raises(RequestEntityTooLarge):
+            get_json()
+    assert body.tell() == 11
+
+
+@pytest.mark.parametrize('blueprint_kwargs', [{'logging': True}])
+def test_logs_parsed_chunked_body(app, flask_client, caplog):
+    app.config['FLUMP_MAX_CONTENT_LENGTH'] = 100
+    data = {'data': {'type': 'user',
+                     'attributes': {'name': 'Carl', 'age': 26}}}
+    body = BytesIO(json.dumps(data).encode('utf-8'))
+    environ = make_chunked_environ(
+        app, body, url_for('flump.user', _method='POST'), method='POST'
+    )
+
+    with caplog.at_level(logging.DEBUG, logger='flump.view.flump'):
+        response = flask_client.open(environ)
+
+    assert response.status_code == 201
+    assert caplog.records[-1].args[3] == data
+
+
+def test_too_large_body_returns_413(app, flask_client):
+    app.config['FLUMP_MAX_CONTENT_LENGTH'] = 10
+    response = create_user(flask_client)
+
+    assert response.status_code == 413
+    assert response.json == {
+        'message': RequestEntityTooLarge.description
+    }